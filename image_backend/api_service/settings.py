@@ -51,6 +51,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.gis',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_gis',
     'debug_toolbar',
@@ -61,6 +62,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'backend.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -132,6 +134,72 @@ DATABASES = {
 #     }
 # }
 
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+# responses are cached on filesystem, in order to share them between
+# workers without requiring an additional service
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config(
+            'CACHE_LOCATION', default=os.path.join(BASE_DIR, "cache/")),
+        'TIMEOUT': config('CACHE_TIMEOUT', cast=int, default=86400),
+        'OPTIONS': {
+            'MAX_ENTRIES': config(
+                'CACHE_MAX_ENTRIES', cast=int, default=10000),
+        }
+    },
+    # vector tiles (keys depend on data versions)
+    'tiles': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config(
+            'TILE_CACHE_LOCATION',
+            default=os.path.join(BASE_DIR, "cache/tiles/")),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': config(
+                'TILE_CACHE_MAX_ENTRIES', cast=int, default=100000),
+        }
+    }
+}
+
+# Compression
+# responses larger than this (in bytes) are compressed with brotli or gzip
+COMPRESSION_MIN_LENGTH = config(
+    'COMPRESSION_MIN_LENGTH', cast=int, default=1024)
+
+# Lookup cache
+# species and DADIS links are cached by each worker: changes made by other
+# workers are checked at most every LOOKUP_CACHE_TIMEOUT seconds
+LOOKUP_CACHE_TIMEOUT = config('LOOKUP_CACHE_TIMEOUT', cast=int, default=60)
+
+# Django REST framework
+# https://www.django-rest-framework.org/api-guide/settings/
+# JSON is encoded and decoded with orjson: set JSON_BACKEND=json to use
+# the default django-rest-framework classes (standard library)
+JSON_BACKEND = config('JSON_BACKEND', default='orjson')
+
+if JSON_BACKEND == 'orjson':
+    JSON_RENDERER = 'backend.renderers.ORJSONRenderer'
+    JSON_PARSER = 'backend.renderers.ORJSONParser'
+
+else:
+    JSON_RENDERER = 'rest_framework.renderers.JSONRenderer'
+    JSON_PARSER = 'rest_framework.parsers.JSONParser'
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        JSON_RENDERER,
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        JSON_PARSER,
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
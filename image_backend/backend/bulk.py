@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:58:09 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+
+Create or update many organisms or specimens with a single request: records
+are validated in one pass and written with batched upsert statements in a
+single transaction
+"""
+
+from collections import OrderedDict
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import DatabaseError, transaction
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+from rest_framework.validators import UniqueValidator
+
+from .upsert import get_etags, get_row, upsert_rows, UNCHANGED
+
+# the max number of records of a bulk request
+BULK_MAX_RECORDS = 1000
+
+# the number of records written by each upsert statement
+BULK_BATCH_SIZE = 250
+
+
+def get_bulk_records(data):
+    """
+    Check the payload of a bulk request
+
+    Parameters
+    ----------
+    data : list
+        The request data (a list of records).
+
+    Raises
+    ------
+    rest_framework.exceptions.ValidationError
+        If data is not a list or is too large.
+
+    Returns
+    -------
+    list
+        The records to be written.
+    """
+
+    if not isinstance(data, list):
+        raise ValidationError(
+            {"records": "Expected a list of records"})
+
+    if len(data) > BULK_MAX_RECORDS:
+        raise ValidationError({
+            "records": f"Too many records (max {BULK_MAX_RECORDS})"})
+
+    return data
+
+
+def get_bulk_serializer(serializer_class, context):
+    """
+    Return a serializer used to validate all the records of a request.
+    Primary keys are not checked for uniqueness (existing records are
+    updated), so validation doesn't need a query for each record
+
+    Parameters
+    ----------
+    serializer_class : rest_framework.serializers.ModelSerializer
+        The serializer class.
+    context : dict
+        The serializer context.
+
+    Returns
+    -------
+    rest_framework.serializers.ModelSerializer
+        A serializer instance.
+    """
+
+    serializer = serializer_class(context=context)
+
+    pk_name = serializer.Meta.model._meta.pk.name
+    field = serializer.fields[pk_name]
+
+    field.validators = [
+        validator for validator in field.validators
+        if not isinstance(validator, UniqueValidator)]
+
+    return serializer
+
+
+def get_status(accession, status, errors=None):
+    result = OrderedDict([
+        ('data_source_id', accession),
+        ('status', status),
+    ])
+
+    if errors:
+        result['errors'] = errors
+
+    return result
+
+
+def upsert_batch(model, columns, updates, batch, results):
+    """
+    Write a batch of records with a single statement. If the statement
+    fails, records are written one by one (each in its own savepoint) to
+    report errors only for the failing records
+
+    Parameters
+    ----------
+    model : django.db.models.Model
+        The Organism or the Specimen class.
+    columns : tuple
+        The columns to be inserted (see :py:func:`backend.upsert.get_row`).
+    updates : tuple
+        The columns updated for existing records.
+    batch : list
+        (index, accession, params) tuples.
+    results : list
+        The status of each record (updated by index).
+    """
+
+    try:
+        with transaction.atomic():
+            statuses = upsert_rows(
+                model, columns, updates, [params for _, _, params in batch])
+
+    except DatabaseError:
+        statuses = dict()
+
+        for index, accession, params in batch:
+            try:
+                with transaction.atomic():
+                    statuses.update(
+                        upsert_rows(model, columns, updates, [params]))
+
+            except DatabaseError as exc:
+                results[index] = get_status(
+                    accession, 'error', {'non_field_errors': [str(exc)]})
+
+    for index, accession, _ in batch:
+        if results[index] is None:
+            # etag was changed by a concurrent write
+            results[index] = get_status(
+                accession, statuses.get(accession, UNCHANGED))
+
+
+@transaction.atomic
+def write_records(serializer, records):
+    """
+    Validate records, then create new records and update the existing ones
+    in a single transaction. Records are written with upsert statements of
+    BULK_BATCH_SIZE records (see :py:mod:`backend.upsert`), records with
+    the same etag of the stored ones are not written. Invalid records and
+    records which can't be written are reported as errors
+
+    Parameters
+    ----------
+    serializer : rest_framework.serializers.ModelSerializer
+        A serializer returned by :py:func:`get_bulk_serializer`.
+    records : list
+        A list of records (dictionaries).
+
+    Returns
+    -------
+    results : list
+        The status of each record ('created', 'updated', 'unchanged' or
+        'error', with errors).
+    """
+
+    model = serializer.Meta.model
+    pk_name = model._meta.pk.name
+
+    results = [None] * len(records)
+    validated = []
+    seen = set()
+
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            results[index] = get_status(
+                None, 'error', {'non_field_errors': ["Expected an object"]})
+            continue
+
+        accession = record.get(pk_name)
+
+        try:
+            validated_data = serializer.run_validation(record)
+
+        except ValidationError as exc:
+            results[index] = get_status(
+                accession, 'error', as_serializer_error(exc))
+            continue
+
+        # the first valid copy of a record is written
+        accession = validated_data[pk_name]
+
+        if accession in seen:
+            results[index] = get_status(
+                accession, 'error', {pk_name: ["Duplicated record"]})
+            continue
+
+        seen.add(accession)
+        validated.append((index, accession, validated_data))
+
+    # read stored etags with a single query
+    stored = get_etags(model, seen)
+
+    # records with the same fields are written by the same statements
+    groups = OrderedDict()
+
+    for index, accession, validated_data in validated:
+        if (accession in stored and
+                stored[accession] == validated_data['etag']):
+            results[index] = get_status(accession, UNCHANGED)
+            continue
+
+        try:
+            columns, params, updates = get_row(model, validated_data)
+
+        except (DatabaseError, ObjectDoesNotExist) as exc:
+            results[index] = get_status(
+                accession, 'error', {'non_field_errors': [str(exc)]})
+            continue
+
+        groups.setdefault((columns, updates), []).append(
+            (index, accession, params))
+
+    for (columns, updates), rows in groups.items():
+        for start in range(0, len(rows), BULK_BATCH_SIZE):
+            upsert_batch(
+                model, columns, updates,
+                rows[start:start + BULK_BATCH_SIZE], results)
+
+    return results
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:15:52 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+
+Compress responses with brotli (if installed) or gzip, relying on the
+Accept-Encoding request header. Cached responses keep a compressed copy of
+their content, which is computed once for each data version
+"""
+
+import gzip
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+
+except ImportError:
+    brotli = None
+
+# content encodings in order of preference
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+# responses smaller than this are not compressed (see settings)
+MIN_LENGTH = 1024
+
+# the levels used for each request (fast) and for cached copies (smaller).
+# Cached copies are compressed while serving a cache miss: higher brotli
+# levels would take seconds on large pages
+LEVELS = {'br': 4, 'gzip': 6}
+PRECOMPRESS_LEVELS = {'br': 6, 'gzip': 9}
+
+# media types which could be compressed (others are already compressed,
+# like gzipped exports)
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/geo+json',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/vnd.mapbox-vector-tile',
+)
+
+
+def get_min_length():
+    return getattr(settings, 'COMPRESSION_MIN_LENGTH', MIN_LENGTH)
+
+
+def get_encoding(request):
+    """
+    Select a content encoding from the Accept-Encoding header
+
+    Parameters
+    ----------
+    request : django.http.HttpRequest
+        The current request.
+
+    Returns
+    -------
+    str
+        The encoding with the highest quality ('br' is preferred over
+        'gzip' with the same quality) or None.
+    """
+
+    accepted = dict()
+
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+
+        if not name:
+            continue
+
+        quality = 1.0
+        params = params.strip().replace(' ', '')
+
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+
+            except ValueError:
+                quality = 0.0
+
+        accepted[name] = quality
+
+    best, encoding = 0.0, None
+
+    for name in ENCODINGS:
+        quality = accepted.get(name, accepted.get('*', 0.0))
+
+        if quality > best:
+            best, encoding = quality, name
+
+    return encoding
+
+
+def is_compressible(response):
+    """Return True if response is a not encoded text/json response"""
+
+    if response.has_header('Content-Encoding'):
+        return False
+
+    return response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(content, encoding, levels=LEVELS):
+    """Compress a bytestring with encoding"""
+
+    if encoding == 'br':
+        return brotli.compress(content, quality=levels['br'])
+
+    # no timestamp: the same content has the same compressed bytes
+    return gzip.compress(content, compresslevel=levels['gzip'], mtime=0)
+
+
+def compress_sequence(sequence, encoding):
+    """
+    Compress the content of a streaming response. Each chunk is flushed,
+    so clients receive data while the response is generated
+
+    Parameters
+    ----------
+    sequence : iterable
+        The content of a streaming response (bytestrings).
+    encoding : str
+        The content encoding ('br' or 'gzip').
+
+    Yields
+    ------
+    bytes
+        Compressed chunks.
+    """
+
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=LEVELS['br'])
+
+        for item in sequence:
+            data = compressor.process(item) + compressor.flush()
+
+            if data:
+                yield data
+
+        yield compressor.finish()
+
+    else:
+        # a gzip header and trailer (wbits=31)
+        compressor = zlib.compressobj(LEVELS['gzip'], zlib.DEFLATED, 31)
+
+        for item in sequence:
+            data = compressor.compress(item) + compressor.flush(
+                zlib.Z_SYNC_FLUSH)
+
+            if data:
+                yield data
+
+        yield compressor.flush()
+
+
+def precompress(request, response, key):
+    """
+    Attach a compressed copy of content to a (cached) response. Copies
+    are stored in cache with the key of the response, so they are
+    computed once for each data version and encoding
+
+    Parameters
+    ----------
+    request : django.http.HttpRequest
+        The current request.
+    response : django.http.HttpResponse
+        A not streaming response.
+    key : str
+        The cache key of the response.
+    """
+
+    if (not is_compressible(response) or
+            len(response.content) < get_min_length()):
+        return
+
+    encoding = get_encoding(request)
+
+    if encoding is None:
+        return
+
+    compressed_key = f"{key}:{encoding}"
+    compressed = cache.get(compressed_key)
+
+    if compressed is None:
+        compressed = compress(
+            response.content, encoding, levels=PRECOMPRESS_LEVELS)
+        cache.set(compressed_key, compressed)
+
+    response.precompressed = {encoding: compressed}
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses larger than COMPRESSION_MIN_LENGTH (streaming
+    responses are always compressed). Similar to
+    :py:class:`django.middleware.gzip.GZipMiddleware`, with brotli support
+    and precompressed content
+    """
+
+    def process_response(self, request, response):
+        if not is_compressible(response):
+            return response
+
+        if (not response.streaming and
+                len(response.content) < get_min_length()):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = get_encoding(request)
+
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                response.streaming_content, encoding)
+            del response['Content-Length']
+
+        else:
+            precompressed = getattr(response, 'precompressed', {})
+            compressed = precompressed.get(encoding, None)
+
+            if compressed is None:
+                compressed = compress(response.content, encoding)
+
+            # return the compressed content only if it's shorter
+            if len(compressed) >= len(response.content):
+                return response
+
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # a strong ETag would be the same for different encodings
+        etag = response.get('ETag', '')
+
+        if etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+
+        response['Content-Encoding'] = encoding
+
+        return response
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:40:12 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+
+Compare etags submitted by the importer with the etag registry
+"""
+
+from django.db import connection
+
+from rest_framework.exceptions import ValidationError
+
+# compare submitted pairs with the registry in a single statement. Registry
+# records are limited to the (after, until] range, in order to support
+# batched requests (a NULL boundary means no limit). Accessions are compared
+# by code point (the "C" collation), like sorted python strings, no matter
+# the database locale (see migration 0029 for the index)
+ETAG_DIFF_SQL = """
+WITH submitted (data_source_id, etag) AS (
+    SELECT * FROM unnest(%(accessions)s::varchar[], %(etags)s::varchar[])
+), registry AS (
+    SELECT data_source_id, etag
+      FROM backend_etag
+     WHERE (%(after)s IS NULL OR
+            data_source_id COLLATE "C" > %(after)s)
+       AND (%(until)s IS NULL OR
+            data_source_id COLLATE "C" <= %(until)s)
+)
+SELECT COALESCE(s.data_source_id, r.data_source_id),
+       CASE WHEN r.data_source_id IS NULL THEN 'new'
+            WHEN s.data_source_id IS NULL THEN 'missing'
+            ELSE 'changed'
+       END
+  FROM submitted AS s
+  FULL OUTER JOIN registry AS r
+    ON s.data_source_id = r.data_source_id
+ WHERE s.etag IS DISTINCT FROM r.etag
+ ORDER BY COALESCE(s.data_source_id, r.data_source_id) COLLATE "C"
+"""
+
+
+def get_etag_diff_options(data):
+    """
+    Read and validate the body of an etag diff request, which is in the
+    form::
+
+        {
+            "etags": [["SAMEA7044752", "<etag>"], ...],
+            "after": "SAMEA7044700",
+            "until": "SAMEA7044800"
+        }
+
+    'after' (exclusive) and 'until' (inclusive) are optional and limit the
+    registry accessions which are reported as missing: they let a client
+    split a sorted list of accessions in batches
+
+    Parameters
+    ----------
+    data : dict
+        The parsed request body.
+
+    Raises
+    ------
+    rest_framework.exceptions.ValidationError
+        If data is not well formatted or if an accession is out of range.
+
+    Returns
+    -------
+    accessions : list
+        The submitted accessions.
+    etags : list
+        The submitted etags (in the same order of accessions).
+    after : str
+        The lower boundary (exclusive) or None.
+    until : str
+        The upper boundary (inclusive) or None.
+    """
+
+    if not isinstance(data, dict) or not isinstance(data.get('etags'), list):
+        raise ValidationError({
+            'etags': "Provide a list of [accession, etag] pairs"})
+
+    after, until = data.get('after'), data.get('until')
+
+    for key, value in (('after', after), ('until', until)):
+        if value is not None and not isinstance(value, str):
+            raise ValidationError({key: "Provide an accession or null"})
+
+    accessions, etags = [], []
+
+    for pair in data['etags']:
+        if (not isinstance(pair, list) or len(pair) != 2 or
+                not all(isinstance(value, str) for value in pair)):
+            raise ValidationError({
+                'etags': f"{pair!r} is not an [accession, etag] pair"})
+
+        accession, etag = pair
+
+        if ((after is not None and accession <= after) or
+                (until is not None and accession > until)):
+            raise ValidationError({
+                'etags': f"{accession} is outside the (after, until] range"})
+
+        accessions.append(accession)
+        etags.append(etag)
+
+    if len(set(accessions)) != len(accessions):
+        raise ValidationError({'etags': "Accessions need to be unique"})
+
+    return accessions, etags, after, until
+
+
+def diff_etags(accessions, etags, after=None, until=None):
+    """
+    Compare submitted etags with the registry
+
+    Parameters
+    ----------
+    accessions : list
+        A list of BioSamples accessions.
+    etags : list
+        The etags of accessions.
+    after : str, optional
+        Ignore registry accessions lower or equal than this. The default
+        is None.
+    until : str, optional
+        Ignore registry accessions greater than this. The default is None.
+
+    Returns
+    -------
+    results : dict
+        A dictionary with the 'new' (not in registry), 'changed' (etags
+        differ) and 'missing' (not submitted) accessions.
+    """
+
+    results = {'new': [], 'changed': [], 'missing': []}
+
+    with connection.cursor() as cursor:
+        cursor.execute(ETAG_DIFF_SQL, {
+            'accessions': accessions,
+            'etags': etags,
+            'after': after,
+            'until': until})
+
+        for accession, status in cursor:
+            results[status].append(accession)
+
+    return results
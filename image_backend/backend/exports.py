@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:20:07 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+
+Stream tabular data to clients without loading the whole dataset in memory
+"""
+
+import csv
+import json
+import zlib
+import itertools
+
+from django.http import StreamingHttpResponse
+
+from rest_framework.exceptions import ValidationError
+
+# supported formats: content type and file extension
+EXPORT_FORMATS = {
+    'tsv': ('text/plain', 'txt'),
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+# files could be exported as a manifest (url and md5 checksum for each line)
+FILES_EXPORT_FORMATS = dict(
+    EXPORT_FORMATS,
+    manifest=('text/plain', 'txt'),
+)
+
+# supported compression methods
+EXPORT_COMPRESSIONS = ('gzip',)
+
+# the number of rows fetched from a server side cursor at each time
+CURSOR_CHUNK_SIZE = 2000
+
+# yield data to the client when the buffer reach this size
+BUFFER_SIZE = 64 * 1024
+
+
+class Echo():
+    """An object that implements just the write method of the file-like
+    interface (used by csv.writer to return lines instead of writing them)
+    """
+
+    def write(self, value):
+        """Write the value by returning it, instead of storing in a buffer."""
+        return value
+
+
+def get_export_options(query_params, formats=EXPORT_FORMATS):
+    """
+    Read and validate 'file_format' and 'compression' from query parameters
+
+    Parameters
+    ----------
+    query_params : django.http.request.QueryDict
+        The GET parameters of a request.
+    formats : dict, optional
+        The supported formats. The default is EXPORT_FORMATS.
+
+    Raises
+    ------
+    rest_framework.exceptions.ValidationError
+        If format or compression are not supported.
+
+    Returns
+    -------
+    file_format : str
+        The requested format (default 'tsv').
+    compression : str
+        The requested compression or None.
+    """
+
+    file_format = query_params.get('file_format', 'tsv').lower()
+    compression = query_params.get('compression', None)
+
+    if file_format not in formats:
+        raise ValidationError({
+            'file_format': "'{value}' not supported: use {choices}".format(
+                value=file_format,
+                choices=", ".join(formats))})
+
+    if compression and compression not in EXPORT_COMPRESSIONS:
+        raise ValidationError({
+            'compression': "'{value}' not supported: use {choices}".format(
+                value=compression,
+                choices=", ".join(EXPORT_COMPRESSIONS))})
+
+    return file_format, compression
+
+
+def iter_lines(rows, columns, header, file_format='tsv'):
+    """
+    Convert rows into text lines
+
+    Parameters
+    ----------
+    rows : iterable
+        An iterable of tuples.
+    columns : list
+        The keys used for each value of a row (used by ndjson).
+    header : list
+        The column names (used by tsv and csv).
+    file_format : str, optional
+        One of 'tsv', 'csv', 'manifest' or 'ndjson'. The default is 'tsv'.
+
+    Yields
+    ------
+    str
+        A line of text (with newline).
+    """
+
+    if file_format == 'ndjson':
+        for row in rows:
+            yield json.dumps(dict(zip(columns, row))) + "\n"
+
+        return
+
+    delimiter = "," if file_format == 'csv' else "\t"
+    writer = csv.writer(Echo(), delimiter=delimiter, lineterminator="\n")
+
+    if header:
+        yield writer.writerow(header)
+
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def unnest_files(rows):
+    """
+    Convert Files rows (with one array for each attribute) in one row for
+    each file
+
+    Parameters
+    ----------
+    rows : iterable
+        An iterable of (data_source_id, file_name, file_url, file_size,
+        file_checksum, file_checksum_method) tuples.
+
+    Yields
+    ------
+    tuple
+        A (data_source_id, file_name, file_url, file_size, file_checksum,
+        file_checksum_method) tuple for each file. Missing values and NULL
+        array elements are returned as empty strings.
+    """
+
+    for data_source_id, *arrays in rows:
+        # a NULL array is like an empty one
+        arrays = [array or [] for array in arrays]
+
+        for values in itertools.zip_longest(*arrays, fillvalue=''):
+            yield (
+                data_source_id,
+                *('' if value is None else value for value in values))
+
+
+def get_manifest_url(url):
+    """ENA urls are stored without protocol: add it to ftp urls"""
+
+    if "://" not in url and url.startswith("ftp."):
+        return "ftp://" + url
+
+    return url
+
+
+def iter_manifest(rows):
+    """
+    Convert unnested Files rows in (url, md5) tuples, ready to be consumed
+    by bulk downloaders
+
+    Parameters
+    ----------
+    rows : iterable
+        An iterable of tuples, as returned by :py:func:`unnest_files`.
+
+    Yields
+    ------
+    tuple
+        A (url, md5) tuple for each file (checksum is empty if it's not a
+        md5 checksum).
+    """
+
+    for _, _, url, _, checksum, method in rows:
+        if (method or '').lower() != 'md5':
+            checksum = ''
+
+        yield get_manifest_url(url or ''), checksum or ''
+
+
+def iter_chunks(lines, compression=None, buffer_size=BUFFER_SIZE):
+    """
+    Join lines in chunks of bytes (optionally compressed), in order to
+    limit the number of writes done by the WSGI server
+
+    Parameters
+    ----------
+    lines : iterable
+        An iterable of strings.
+    compression : str, optional
+        Compress data with 'gzip'. The default is None.
+    buffer_size : int, optional
+        The size of a chunk. The default is BUFFER_SIZE.
+
+    Yields
+    ------
+    bytes
+        A chunk of data.
+    """
+
+    compressor = None
+
+    if compression == 'gzip':
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    buffer, size = [], 0
+
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+
+        if size >= buffer_size:
+            chunk = "".join(buffer).encode()
+            buffer, size = [], 0
+
+            if compressor:
+                chunk = compressor.compress(chunk)
+
+                # compressor could keep all data in its internal buffer
+                if not chunk:
+                    continue
+
+            yield chunk
+
+    chunk = "".join(buffer).encode()
+
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+
+    if chunk:
+        yield chunk
+
+
+def stream_export(
+        rows, columns, header, filename, file_format='tsv',
+        compression=None, formats=EXPORT_FORMATS):
+    """
+    Create a streaming response from rows
+
+    Parameters
+    ----------
+    rows : iterable
+        An iterable of tuples, like a values_list queryset iterator.
+    columns : list
+        The keys used for each value of a row (used by ndjson).
+    header : list
+        The column names (used by tsv and csv).
+    filename : str
+        The downloaded file name (without extension).
+    file_format : str, optional
+        One of the supported formats. The default is 'tsv'.
+    compression : str, optional
+        Compress data with 'gzip'. The default is None.
+    formats : dict, optional
+        The supported formats. The default is EXPORT_FORMATS.
+
+    Returns
+    -------
+    response : django.http.StreamingHttpResponse
+        The response object.
+    """
+
+    content_type, extension = formats[file_format]
+    filename = f"{filename}.{extension}"
+
+    if compression == 'gzip':
+        content_type = 'application/gzip'
+        filename += ".gz"
+
+    response = StreamingHttpResponse(
+        iter_chunks(
+            iter_lines(rows, columns, header, file_format),
+            compression),
+        content_type=content_type)
+
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+    return response
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:02:18 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+
+Custom filters used by backend views
+"""
+
+import django_filters
+
+from django.db.models import F
+from django.template import loader
+from django.contrib.postgres.search import SearchQuery, SearchRank
+
+from rest_framework import filters
+
+from .models import Organism, Specimen
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    A drop-in replacement of :py:class:`rest_framework.filters.SearchFilter`
+    which relies on the indexed 'search_vector' column instead of doing a
+    'ILIKE' on each field of 'search_fields' (views don't need to define
+    them: the searched columns are defined by the trigger which computes
+    'search_vector', see migration 0021). Every search term need to
+    match the beginning of a word in the document. Results are ordered by
+    rank (relevance)
+    """
+
+    search_vector_field = 'search_vector'
+    search_config = 'simple'
+
+    def get_search_query(self, search_terms):
+        """Convert search terms in a tsquery (all terms are required and are
+        matched as prefixes)"""
+
+        lexemes = []
+
+        for term in search_terms:
+            # quote lexemes in order to deal with tsquery operators
+            term = term.replace("\\", "\\\\").replace("'", "''")
+            lexemes.append(f"'{term}':*")
+
+        return SearchQuery(
+            " & ".join(lexemes),
+            config=self.search_config,
+            search_type='raw')
+
+    def to_html(self, request, queryset, view):
+        """Render the search form in the browsable API (the parent class
+        requires 'search_fields')"""
+
+        term = self.get_search_terms(request)
+        context = {
+            'param': self.search_param,
+            'term': term[0] if term else ''
+        }
+
+        return loader.get_template(self.template).render(context)
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+
+        if not search_terms:
+            return queryset
+
+        query = self.get_search_query(search_terms)
+
+        return queryset.filter(
+            **{self.search_vector_field: query}
+        ).annotate(
+            search_rank=SearchRank(F(self.search_vector_field), query)
+        ).order_by('-search_rank')
+
+
+class OrganismFilter(django_filters.FilterSet):
+    """
+    Filter organisms by exact values. Breeds could be matched case
+    insensitive ('supplied_breed__iexact') or by trigram similarity
+    ('supplied_breed__similar'): both lookups are supported by indexes.
+    Coordinates could be filtered by range ('latitude__gte', ...)
+    """
+
+    supplied_breed__similar = django_filters.CharFilter(
+        field_name='supplied_breed',
+        lookup_expr='trigram_similar')
+
+    class Meta:
+        model = Organism
+        fields = {
+            'species': ['exact'],
+            'supplied_breed': ['exact', 'iexact'],
+            'efabis_breed_country': ['exact'],
+            'sex': ['exact'],
+            'latitude': ['gte', 'lte'],
+            'longitude': ['gte', 'lte'],
+        }
+
+
+class SpecimenFilter(django_filters.FilterSet):
+    """
+    Filter specimens by exact values. Coordinates could be filtered by
+    range ('latitude__gte', ...)
+    """
+
+    class Meta:
+        model = Specimen
+        fields = {
+            'species': ['exact'],
+            'organism_part': ['exact'],
+            'latitude': ['gte', 'lte'],
+            'longitude': ['gte', 'lte'],
+        }
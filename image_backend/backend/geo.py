@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:05:41 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+
+Helper functions to deal with spatial queries
+"""
+
+from django.db import connection
+from django.db.models import BooleanField, Count, FloatField, Func, Value
+from django.contrib.gis.db.models import GeometryField
+from django.contrib.gis.db.models.functions import SnapToGrid
+from django.contrib.gis.gdal import GDALException
+from django.contrib.gis.geos import GEOSGeometry, GEOSException, Polygon
+
+from rest_framework.exceptions import ValidationError
+
+# how many grid cells are used to divide a map tile when snapping coordinates
+# relying on a zoom level
+GRID_CELLS_PER_TILE = 64
+
+# the maximum zoom level supported
+MAX_ZOOM = 24
+
+# how many grid cells are used to divide a map tile when clustering points
+CLUSTER_CELLS_PER_TILE = 8
+
+# cluster points snapped on the same grid cell: return the centroid, the
+# number of points and the most frequent value of a property
+CLUSTER_SQL = """
+SELECT ST_X(centroid), ST_Y(centroid), total, dominant
+  FROM (
+      SELECT ST_Centroid(ST_Collect(t.geom)) AS centroid,
+             COUNT(*) AS total,
+             mode() WITHIN GROUP (ORDER BY t.{field}) AS dominant
+        FROM ({subquery}) AS t
+    GROUP BY ST_SnapToGrid(t.geom, %s)
+  ) AS clusters
+ ORDER BY total DESC
+"""
+
+# geometry types accepted by 'within' filter
+WITHIN_TYPES = ('Polygon', 'MultiPolygon')
+
+# the content type of a Mapbox Vector Tile
+MVT_CONTENT_TYPE = 'application/vnd.mapbox-vector-tile'
+
+# render a tile in web mercator. Points are selected with the spatial index
+# on geom (tile envelope is transformed in WGS84)
+TILE_SQL = """
+WITH bounds AS (
+    SELECT ST_TileEnvelope(%(z)s, %(x)s, %(y)s) AS envelope
+), features AS (
+    SELECT ST_AsMVTGeom(
+               ST_Transform(t.geom, 3857), bounds.envelope) AS geom,
+           {columns}
+      FROM {table} AS t, bounds
+     WHERE t.geom && ST_Transform(bounds.envelope, 4326)
+)
+SELECT ST_AsMVT(features.*, %(layer)s, 4096, 'geom') FROM features
+"""
+
+
+def get_grid_size(query_params):
+    """
+    Read 'precision' (grid size in degrees) or 'zoom' (a map zoom level)
+    from query params and return the size of the grid used to snap
+    coordinates
+
+    Parameters
+    ----------
+    query_params : django.http.request.QueryDict
+        The GET parameters of a request.
+
+    Raises
+    ------
+    rest_framework.exceptions.ValidationError
+        If parameters can't be converted in a positive grid size.
+
+    Returns
+    -------
+    float
+        The grid size in degrees (or None if not requested).
+    """
+
+    precision = query_params.get('precision', None)
+    zoom = query_params.get('zoom', None)
+
+    if precision:
+        try:
+            precision = float(precision)
+
+        except ValueError:
+            raise ValidationError(
+                {'precision': f"'{precision}' is not a valid number"})
+
+        if precision <= 0:
+            raise ValidationError(
+                {'precision': "precision need to be a positive number"})
+
+        return precision
+
+    if zoom:
+        return zoom_to_grid_size(zoom)
+
+    return None
+
+
+def get_bbox(query_params):
+    """
+    Read 'bbox' (minx,miny,maxx,maxy in WGS84) from query params
+
+    Parameters
+    ----------
+    query_params : django.http.request.QueryDict
+        The GET parameters of a request.
+
+    Raises
+    ------
+    rest_framework.exceptions.ValidationError
+        If bbox is not valid.
+
+    Returns
+    -------
+    django.contrib.gis.geos.Polygon
+        The bounding box polygon (or None if not requested).
+    """
+
+    bbox = query_params.get('bbox', None)
+
+    if not bbox:
+        return None
+
+    try:
+        minx, miny, maxx, maxy = [float(value) for value in bbox.split(",")]
+
+    except ValueError:
+        raise ValidationError(
+            {'bbox': "bbox need to be in the form 'minx,miny,maxx,maxy'"})
+
+    if minx > maxx or miny > maxy:
+        raise ValidationError(
+            {'bbox': "bbox minimum values can't be greater than maximum"})
+
+    polygon = Polygon.from_bbox((minx, miny, maxx, maxy))
+    polygon.srid = 4326
+
+    return polygon
+
+
+def get_within(query_params):
+    """
+    Read 'within' (a GeoJSON polygon or multipolygon in WGS84) from query
+    params
+
+    Parameters
+    ----------
+    query_params : django.http.request.QueryDict
+        The GET parameters of a request.
+
+    Raises
+    ------
+    rest_framework.exceptions.ValidationError
+        If within is not a valid polygon.
+
+    Returns
+    -------
+    django.contrib.gis.geos.GEOSGeometry
+        The polygon (or None if not requested).
+    """
+
+    within = query_params.get('within', None)
+
+    if not within:
+        return None
+
+    try:
+        geometry = GEOSGeometry(within, srid=4326)
+
+    except (ValueError, GEOSException, GDALException):
+        raise ValidationError({'within': "Not a valid GeoJSON geometry"})
+
+    if geometry.geom_type not in WITHIN_TYPES:
+        raise ValidationError({
+            'within': "geometry need to be a {types}".format(
+                types=" or ".join(WITHIN_TYPES))})
+
+    return geometry
+
+
+def get_point(query_params):
+    """
+    Read 'lng', 'lat' and 'rad' (a radius in km) from query params
+
+    Parameters
+    ----------
+    query_params : django.http.request.QueryDict
+        The GET parameters of a request.
+
+    Raises
+    ------
+    rest_framework.exceptions.ValidationError
+        If values are not numbers.
+
+    Returns
+    -------
+    point : django.contrib.gis.geos.Point
+        The requested point (or None if not requested).
+    radius : float
+        The radius in meters (or None if not requested).
+    """
+
+    lat = query_params.get('lat', None)
+    lng = query_params.get('lng', None)
+    rad = query_params.get('rad', None)
+
+    if not (lat and lng):
+        return None, None
+
+    try:
+        point = GEOSGeometry(f'POINT({float(lng)} {float(lat)})', srid=4326)
+        radius = float(rad) * 1000 if rad else None
+
+    except ValueError:
+        raise ValidationError(
+            {'detail': "lat, lng and rad need to be numbers"})
+
+    return point, radius
+
+
+def get_knn_limit(query_params):
+    """
+    Read 'k' (the number of nearest neighbours) from query params
+
+    Parameters
+    ----------
+    query_params : django.http.request.QueryDict
+        The GET parameters of a request.
+
+    Raises
+    ------
+    rest_framework.exceptions.ValidationError
+        If k is not a positive integer.
+
+    Returns
+    -------
+    int
+        The number of objects to return (or None if not requested).
+    """
+
+    k = query_params.get('k', None)
+
+    if not k:
+        return None
+
+    try:
+        k = int(k)
+
+    except ValueError:
+        raise ValidationError({'k': f"'{k}' is not a valid number"})
+
+    if k <= 0:
+        raise ValidationError({'k': "k need to be a positive number"})
+
+    return k
+
+
+class AsGeography(Func):
+    """Cast a geometry to geography (match the geography indexes on
+    geom)"""
+
+    template = '(%(expressions)s)::geography'
+    output_field = GeometryField(geography=True)
+
+
+class GeographyKNN(Func):
+    """The '<->' distance operator on geography: ordering by this expression
+    is a nearest neighbour search on the geography indexes"""
+
+    template = '%(expressions)s'
+    arg_joiner = ' <-> '
+    output_field = FloatField()
+
+    def __init__(self, geo_field, point):
+        super().__init__(
+            AsGeography(geo_field),
+            AsGeography(Value(point, output_field=GeometryField(srid=4326))))
+
+
+def dwithin_geography(geo_field, point, distance):
+    """
+    An index capable ST_DWithin on geography (distance in meters). Need
+    to be annotated and then filtered with True
+
+    Parameters
+    ----------
+    geo_field : str
+        The name of the geometry field.
+    point : django.contrib.gis.geos.Point
+        The reference point.
+    distance : float
+        The distance in meters.
+
+    Returns
+    -------
+    django.db.models.Func
+        A boolean expression.
+    """
+
+    return Func(
+        AsGeography(geo_field),
+        AsGeography(Value(point, output_field=GeometryField(srid=4326))),
+        Value(distance),
+        function='ST_DWithin',
+        output_field=BooleanField())
+
+
+def zoom_to_grid_size(zoom, cells=GRID_CELLS_PER_TILE):
+    """Convert a map zoom level into a grid size (in degrees)"""
+
+    try:
+        zoom = int(zoom)
+
+    except ValueError:
+        raise ValidationError({'zoom': f"'{zoom}' is not a valid zoom level"})
+
+    if zoom < 0 or zoom > MAX_ZOOM:
+        raise ValidationError(
+            {'zoom': f"zoom need to be between 0 and {MAX_ZOOM}"})
+
+    return 360.0 / (2 ** zoom * cells)
+
+
+def count_grid_cells(queryset, size, geo_field='geom'):
+    """
+    Snap geometries to a regular grid and count objects in each cell
+
+    Parameters
+    ----------
+    queryset : django.db.models.query.QuerySet
+        A queryset of objects with a geometry field.
+    size : float
+        The grid size in degrees.
+    geo_field : str, optional
+        The name of the geometry field. The default is 'geom'.
+
+    Returns
+    -------
+    list
+        A list of [longitude, latitude, count] items (one for each not
+        empty cell).
+    """
+
+    cell = SnapToGrid(geo_field, size)
+
+    qs = queryset.filter(**{f"{geo_field}__isnull": False}).annotate(
+        cell_lng=Func(cell, function='ST_X', output_field=FloatField()),
+        cell_lat=Func(cell, function='ST_Y', output_field=FloatField()),
+    ).values_list('cell_lng', 'cell_lat').annotate(
+        total=Count('pk')).order_by()
+
+    return [[lng, lat, total] for lng, lat, total in qs]
+
+
+def check_tile(z, x, y):
+    """
+    Check that tile coordinates are valid
+
+    Parameters
+    ----------
+    z : int
+        The zoom level.
+    x : int
+        The tile column.
+    y : int
+        The tile row.
+
+    Raises
+    ------
+    rest_framework.exceptions.ValidationError
+        If tile doesn't exist.
+    """
+
+    if z < 0 or z > MAX_ZOOM:
+        raise ValidationError(
+            {'z': f"zoom need to be between 0 and {MAX_ZOOM}"})
+
+    if not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise ValidationError(
+            {'tile': f"tile {z}/{x}/{y} doesn't exist"})
+
+
+def get_tile(table, layer, columns, z, x, y):
+    """
+    Render a Mapbox Vector Tile with ST_AsMVT
+
+    Parameters
+    ----------
+    table : str
+        The table with a 'geom' column.
+    layer : str
+        The name of the tile layer.
+    columns : tuple
+        The columns used as feature properties.
+    z : int
+        The zoom level.
+    x : int
+        The tile column.
+    y : int
+        The tile row.
+
+    Returns
+    -------
+    bytes
+        The tile content (empty if there are no features).
+    """
+
+    check_tile(z, x, y)
+
+    sql = TILE_SQL.format(
+        table=table,
+        columns=", ".join(f"t.{column}" for column in columns))
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {'z': z, 'x': x, 'y': y, 'layer': layer})
+        tile = cursor.fetchone()[0]
+
+    return bytes(tile) if tile else b''
+
+
+def cluster_points(queryset, zoom, field):
+    """
+    Cluster points in PostGIS by snapping them on a grid whose size depends
+    on zoom level
+
+    Parameters
+    ----------
+    queryset : django.db.models.query.QuerySet
+        A (filtered) queryset of objects with a 'geom' field.
+    zoom : str
+        A map zoom level.
+    field : str
+        The field used to determine the dominant value of each cluster.
+
+    Returns
+    -------
+    dict
+        A GeoJSON FeatureCollection of clusters (centroid, count and
+        dominant value).
+    """
+
+    size = zoom_to_grid_size(zoom, cells=CLUSTER_CELLS_PER_TILE)
+
+    subquery, params = queryset.order_by().values_list(
+        'geom', field).query.sql_with_params()
+
+    features = []
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            CLUSTER_SQL.format(field=field, subquery=subquery),
+            params + (size, ))
+
+        for lng, lat, total, dominant in cursor:
+            features.append({
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [lng, lat]
+                },
+                "properties": {
+                    "count": total,
+                    field: dominant
+                }
+            })
+
+    return {
+        "type": "FeatureCollection",
+        "features": features
+    }
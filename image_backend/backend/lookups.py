@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:12:08 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+
+A per-worker cache of species and DADIS links, used while writing organisms
+and DADIS links. Entries are dropped when those tables are written by this
+worker (model signals) or by anyone else (data versions are checked at most
+every LOOKUP_CACHE_TIMEOUT seconds)
+"""
+
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import DataVersion, DADISLink, Species2CommonName
+
+# the tables of cached objects (see DataVersion)
+TABLES = (Species2CommonName._meta.db_table, DADISLink._meta.db_table)
+
+# check data versions at most every TIMEOUT seconds (see settings)
+TIMEOUT = 60
+
+
+def get_timeout():
+    return getattr(settings, 'LOOKUP_CACHE_TIMEOUT', TIMEOUT)
+
+
+def get_key(kwargs):
+    """Return a hashable key from lookup arguments (lists are converted
+    into tuples)"""
+
+    return tuple(sorted(
+        (key, tuple(value) if isinstance(value, list) else value)
+        for key, value in kwargs.items()))
+
+
+class LookupCache():
+    """Species and DADIS links of this worker"""
+
+    def __init__(self):
+        self.species = dict()
+        self.links = dict()
+
+        # the data versions of cached objects and the time of the last check
+        self.versions = None
+        self.checked = None
+
+    def clear(self):
+        self.species.clear()
+        self.links.clear()
+
+    def validate(self):
+        """Clear cache if tables were modified (by any worker)"""
+
+        now = time.monotonic()
+
+        if self.checked is not None and now - self.checked < get_timeout():
+            return
+
+        versions = dict(
+            DataVersion.objects.filter(table_name__in=TABLES).values_list(
+                'table_name', 'version'))
+
+        if versions != self.versions:
+            self.clear()
+            self.versions = versions
+
+        self.checked = now
+
+
+cache = LookupCache()
+
+
+def get_species(**kwargs):
+    """
+    Get a species like :py:meth:`Species2CommonName.objects.get`. Found
+    species are cached
+
+    Parameters
+    ----------
+    **kwargs : dict
+        Lookup arguments (like scientific_name and common_name).
+
+    Raises
+    ------
+    Species2CommonName.DoesNotExist
+        If species doesn't exist.
+
+    Returns
+    -------
+    backend.models.Species2CommonName
+        A Species2CommonName instance.
+    """
+
+    cache.validate()
+
+    key = get_key(kwargs)
+    species = cache.species.get(key)
+
+    if species is None:
+        species = Species2CommonName.objects.get(**kwargs)
+        cache.species[key] = species
+
+    return species
+
+
+def get_or_create_link(species, **kwargs):
+    """
+    Get or create a DADIS link like
+    :py:meth:`DADISLink.objects.get_or_create`. Links are cached (new
+    links when the current transaction is committed)
+
+    Parameters
+    ----------
+    species : backend.models.Species2CommonName
+        A Species2CommonName instance.
+    **kwargs : dict
+        The other lookup arguments.
+
+    Returns
+    -------
+    link : backend.models.DADISLink
+        A DADISLink instance.
+    created : bool
+        True if link was created.
+    """
+
+    cache.validate()
+
+    key = (species.pk, get_key(kwargs))
+    link = cache.links.get(key)
+
+    if link is not None:
+        return link, False
+
+    link, created = DADISLink.objects.get_or_create(species=species, **kwargs)
+
+    if created:
+        # a rolled back link must not be cached
+        transaction.on_commit(lambda: cache.links.__setitem__(key, link))
+
+    else:
+        cache.links[key] = link
+
+    return link, created
+
+
+@receiver(post_save, sender=Species2CommonName)
+@receiver(post_save, sender=DADISLink)
+def clear_on_save(sender, instance, created, **kwargs):
+    # new objects don't change cached ones
+    if not created:
+        cache.clear()
+
+
+@receiver(post_delete, sender=Species2CommonName)
+@receiver(post_delete, sender=DADISLink)
+def clear_on_delete(sender, instance, **kwargs):
+    cache.clear()
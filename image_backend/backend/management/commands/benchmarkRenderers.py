@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:47:36 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+"""
+
+from collections import OrderedDict
+from io import BytesIO
+
+from django.core.management import BaseCommand
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from backend.models import Organism
+from backend.renderers import ORJSONRenderer, ORJSONParser, orjson
+from backend.representation import get_plan
+from backend.serializers import OrganismSerializer
+
+from .benchmarkSerializers import measure
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the encode (and decode) time of organism pages with the '
+        'default and the orjson renderers')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            nargs='+',
+            default=[500, 5000],
+            help="The number of organisms of each page"
+        )
+
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help="Repeat each measure and take the best time"
+        )
+
+    def handle(self, *args, **options):
+        """Render organism pages like ListOrganismsView"""
+
+        if orjson is None:
+            print("orjson is not installed: ORJSONRenderer uses json")
+
+        request = Request(APIRequestFactory().get('/backend/organism/'))
+        context = {'request': request, 'format': None, 'view': None}
+
+        queryset = Organism.objects.select_related(
+            "dadis", "dadis__species").order_by('pk')
+
+        plan = get_plan(OrganismSerializer(context=context), queryset)
+
+        print(
+            f"{'rows':>8}{'MB':>8}{'json ms':>10}{'orjson ms':>11}"
+            f"{'speedup':>9}{'parse ms':>10}{'orjson ms':>11}{'speedup':>9}"
+            "  identical")
+
+        for page_size in options['page_size']:
+            rows = list(queryset.values(*plan.columns)[:page_size])
+
+            data = OrderedDict([
+                ('next', None),
+                ('previous', None),
+                ('count', len(rows)),
+                ('total_pages', 1),
+                ('results', plan.to_representation_many(rows))
+            ])
+
+            before, expected = measure(
+                lambda: JSONRenderer().render(data), options['repeat'])
+            after, content = measure(
+                lambda: ORJSONRenderer().render(data), options['repeat'])
+
+            parse_before, _ = measure(
+                lambda: JSONParser().parse(BytesIO(content)),
+                options['repeat'])
+            parse_after, _ = measure(
+                lambda: ORJSONParser().parse(BytesIO(content)),
+                options['repeat'])
+
+            print(
+                f"{len(rows):>8}{len(content) / 2 ** 20:>8.1f}"
+                f"{before * 1000:>10.1f}{after * 1000:>11.1f}"
+                f"{before / after:>8.1f}x"
+                f"{parse_before * 1000:>10.1f}{parse_after * 1000:>11.1f}"
+                f"{parse_before / parse_after:>8.1f}x"
+                f"  {'yes' if expected == content else 'NO'}")
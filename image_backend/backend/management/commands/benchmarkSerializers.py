@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 20:52:17 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+"""
+
+import json
+import time
+
+from django.core.management import BaseCommand
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.geos import Point
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.utils.encoders import JSONEncoder
+
+from backend.models import Organism, Specimen, Etag
+from backend.representation import get_plan
+from backend.serializers import (
+    OrganismSerializer, SpecimenSerializer, EtagSerializer,
+    GeoOrganismSerializer, GeoSpecimenSerializer)
+
+# a point used to annotate GeoJSON features by distance
+POINT = Point(10, 45, srid=4326)
+
+
+def get_benchmarks():
+    """Return (name, serializer class, queryset) tuples"""
+
+    return [
+        (
+            'organism',
+            OrganismSerializer,
+            Organism.objects.select_related("dadis", "dadis__species")
+        ),
+        ('specimen', SpecimenSerializer, Specimen.objects.all()),
+        ('etag', EtagSerializer, Etag.objects.all()),
+        (
+            'organism.geojson',
+            GeoOrganismSerializer,
+            Organism.objects.filter(geom__isnull=False).annotate(
+                distance=Distance('geom', POINT, spheroid=True))
+        ),
+        (
+            'specimen.geojson',
+            GeoSpecimenSerializer,
+            Specimen.objects.filter(geom__isnull=False).annotate(
+                distance=Distance('geom', POINT, spheroid=True))
+        ),
+    ]
+
+
+def measure(function, repeat):
+    """Return the best time of function and its result"""
+
+    best, result = None, None
+
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best, result
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the representation of list pages with serializers and '
+        'with precompiled plans (rows per second)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            nargs='+',
+            default=[500, 5000],
+            help="The number of rows of each page"
+        )
+
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help="Repeat each measure and take the best time"
+        )
+
+    def handle(self, *args, **options):
+        """Read and represent the first rows of each list, then check that
+        outputs are identical"""
+
+        request = Request(APIRequestFactory().get('/backend/'))
+        context = {'request': request, 'format': None, 'view': None}
+
+        print(
+            f"{'endpoint':<20}{'rows':>8}{'serializer':>14}"
+            f"{'plan':>14}{'speedup':>9}  identical")
+
+        for name, serializer_class, queryset in get_benchmarks():
+            queryset = queryset.order_by('pk')
+
+            # some serializers can't be represented with a plan
+            if get_plan(serializer_class(context=context), queryset) is None:
+                print(f"{name:<20}{'no plan':>8}")
+                continue
+
+            for page_size in options['page_size']:
+                def serialize():
+                    page = list(queryset[:page_size])
+                    serializer = serializer_class(
+                        page, many=True, context=context)
+                    return serializer.data
+
+                def represent():
+                    # plans are compiled for each request, like in views
+                    serializer = serializer_class(context=context)
+                    plan = get_plan(serializer, queryset)
+                    page = list(
+                        queryset.values(*plan.columns)[:page_size])
+                    return plan.to_representation_many(page)
+
+                before, expected = measure(serialize, options['repeat'])
+                after, data = measure(represent, options['repeat'])
+
+                # the GeoJSON serializer returns a dictionary
+                rows = len(expected.get('features', [])) if isinstance(
+                    expected, dict) else len(expected)
+
+                if not rows:
+                    print(f"{name:<20}{'no data':>8}")
+                    break
+
+                identical = (
+                    json.dumps(expected, cls=JSONEncoder) ==
+                    json.dumps(data, cls=JSONEncoder))
+
+                print(
+                    f"{name:<20}{rows:>8}{rows / before:>14.0f}"
+                    f"{rows / after:>14.0f}{before / after:>8.1f}x  "
+                    f"{'yes' if identical else 'NO'}")
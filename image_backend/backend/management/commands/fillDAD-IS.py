@@ -12,7 +12,7 @@ import collections
 
 from django.core.management import BaseCommand
 
-from backend.models import Species2CommonName, DADISLink
+from backend.lookups import get_species, get_or_create_link
 
 
 class Command(BaseCommand):
@@ -44,8 +44,7 @@ class Command(BaseCommand):
 
         for row in map(Data._make, reader):
             # get a specie
-            species = Species2CommonName.objects.get(
-                scientific_name=row.species)
+            species = get_species(scientific_name=row.species)
 
             # deal with other name
             other_name = []
@@ -55,8 +54,8 @@ class Command(BaseCommand):
                     name.strip() for name in row.other_name.split(",")]
 
             # create a record
-            instance, created = DADISLink.objects.update_or_create(
-                species=species,
+            instance, created = get_or_create_link(
+                species,
                 supplied_breed=row.supplied_breed,
                 country=row.country,
                 iso3=row.iso3,
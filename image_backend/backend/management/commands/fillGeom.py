@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:20:33 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+"""
+
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+
+from backend.models import Organism, Specimen
+
+# touch a batch of records: numeric coordinates and geom are computed by
+# the coordinates trigger (see migrations)
+UPDATE_SQL = """
+UPDATE {table}
+   SET {latitude} = {latitude}
+ WHERE data_source_id = ANY(%s)
+"""
+
+
+class Command(BaseCommand):
+    help = 'Compute numeric coordinates and geom for all records'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="The number of records updated in each transaction"
+        )
+
+    def handle(self, *args, **options):
+        """Update records in batches, following the primary key"""
+
+        batch_size = options['batch_size']
+
+        for model, latitude in [
+                (Organism, 'birth_location_latitude'),
+                (Specimen, 'collection_place_latitude')]:
+            sql = UPDATE_SQL.format(
+                table=model._meta.db_table, latitude=latitude)
+
+            last, count = None, 0
+
+            while True:
+                qs = model.objects.order_by('data_source_id')
+
+                if last is not None:
+                    qs = qs.filter(data_source_id__gt=last)
+
+                batch = list(qs.values_list(
+                    'data_source_id', flat=True)[:batch_size])
+
+                if not batch:
+                    break
+
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(sql, [batch])
+
+                last = batch[-1]
+                count += len(batch)
+
+            with_geom = model.objects.filter(geom__isnull=False).count()
+
+            print(
+                f"{model._meta.verbose_name_plural}: {count} records "
+                f"updated, {with_geom} with coordinates")
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:30:12 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+"""
+
+from django.core.management import BaseCommand
+
+from backend.models import OrganismSummary, SpecimenSummary
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the organism and specimen summary tables'
+
+    def handle(self, *args, **options):
+        """Count organisms and specimens and fill summary tables"""
+
+        for model in [OrganismSummary, SpecimenSummary]:
+            count = model.refresh()
+            print(f"{model._meta.verbose_name}: {count} rows written")
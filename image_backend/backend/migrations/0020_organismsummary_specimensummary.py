@@ -0,0 +1,159 @@
+# Generated by Django 2.2.27 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+# keep summary tables in sync with organism and specimen tables. Counts are
+# updated incrementally for each written row: an update is processed only
+# if one of the summarized columns changes
+ORGANISM_SUMMARY_SQL = """
+CREATE OR REPLACE FUNCTION backend_organism_summary_trigger()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND
+            (OLD.species, OLD.supplied_breed, OLD.sex,
+             OLD.efabis_breed_country) IS NOT DISTINCT FROM
+            (NEW.species, NEW.supplied_breed, NEW.sex,
+             NEW.efabis_breed_country) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE backend_organismsummary
+           SET total = total - 1
+         WHERE species = OLD.species
+           AND supplied_breed = OLD.supplied_breed
+           AND sex = OLD.sex
+           AND efabis_breed_country = OLD.efabis_breed_country;
+
+        DELETE FROM backend_organismsummary
+         WHERE species = OLD.species
+           AND supplied_breed = OLD.supplied_breed
+           AND sex = OLD.sex
+           AND efabis_breed_country = OLD.efabis_breed_country
+           AND total <= 0;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO backend_organismsummary (
+            species, supplied_breed, sex, efabis_breed_country, total)
+        VALUES (
+            NEW.species, NEW.supplied_breed, NEW.sex,
+            NEW.efabis_breed_country, 1)
+        ON CONFLICT (species, supplied_breed, sex, efabis_breed_country)
+        DO UPDATE SET total = backend_organismsummary.total + 1;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER backend_organism_summary
+    AFTER INSERT OR UPDATE OR DELETE ON backend_organism
+    FOR EACH ROW EXECUTE PROCEDURE backend_organism_summary_trigger();
+
+INSERT INTO backend_organismsummary (
+    species, supplied_breed, sex, efabis_breed_country, total)
+SELECT species, supplied_breed, sex, efabis_breed_country, count(*)
+  FROM backend_organism
+ GROUP BY species, supplied_breed, sex, efabis_breed_country;
+"""
+
+ORGANISM_SUMMARY_REVERSE_SQL = """
+DROP TRIGGER IF EXISTS backend_organism_summary ON backend_organism;
+DROP FUNCTION IF EXISTS backend_organism_summary_trigger();
+"""
+
+SPECIMEN_SUMMARY_SQL = """
+CREATE OR REPLACE FUNCTION backend_specimen_summary_trigger()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND
+            (OLD.species, OLD.organism_part) IS NOT DISTINCT FROM
+            (NEW.species, NEW.organism_part) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE backend_specimensummary
+           SET total = total - 1
+         WHERE species = OLD.species
+           AND organism_part = OLD.organism_part;
+
+        DELETE FROM backend_specimensummary
+         WHERE species = OLD.species
+           AND organism_part = OLD.organism_part
+           AND total <= 0;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO backend_specimensummary (species, organism_part, total)
+        VALUES (NEW.species, NEW.organism_part, 1)
+        ON CONFLICT (species, organism_part)
+        DO UPDATE SET total = backend_specimensummary.total + 1;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER backend_specimen_summary
+    AFTER INSERT OR UPDATE OR DELETE ON backend_specimen
+    FOR EACH ROW EXECUTE PROCEDURE backend_specimen_summary_trigger();
+
+INSERT INTO backend_specimensummary (species, organism_part, total)
+SELECT species, organism_part, count(*)
+  FROM backend_specimen
+ GROUP BY species, organism_part;
+"""
+
+SPECIMEN_SUMMARY_REVERSE_SQL = """
+DROP TRIGGER IF EXISTS backend_specimen_summary ON backend_specimen;
+DROP FUNCTION IF EXISTS backend_specimen_summary_trigger();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0019_dadislink_iso3'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganismSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('species', models.CharField(max_length=1000)),
+                ('supplied_breed', models.CharField(max_length=1000)),
+                ('sex', models.CharField(max_length=1000)),
+                ('efabis_breed_country', models.CharField(max_length=1000)),
+            ],
+            options={
+                'verbose_name': 'Organism summary',
+                'verbose_name_plural': 'Organism summaries',
+                'unique_together': {('species', 'supplied_breed', 'sex', 'efabis_breed_country')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SpecimenSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('species', models.CharField(max_length=1000)),
+                ('organism_part', models.CharField(max_length=1000)),
+            ],
+            options={
+                'verbose_name': 'Specimen summary',
+                'verbose_name_plural': 'Specimen summaries',
+                'unique_together': {('species', 'organism_part')},
+            },
+        ),
+        migrations.RunSQL(
+            ORGANISM_SUMMARY_SQL,
+            ORGANISM_SUMMARY_REVERSE_SQL),
+        migrations.RunSQL(
+            SPECIMEN_SUMMARY_SQL,
+            SPECIMEN_SUMMARY_REVERSE_SQL),
+    ]
@@ -0,0 +1,129 @@
+# Generated by Django 2.2.27 on 2026-10-18 13:40
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# columns used to build the full text search document, by weight: ids,
+# species and breeds are the most relevant terms, descriptions the least
+COMMON_WEIGHTS = {
+    'A': ['data_source_id', 'alternative_id', 'species'],
+    'B': ['project', 'material', 'gene_bank_name', 'gene_bank_country',
+          'person_last_name[]', 'person_first_name[]', 'person_email[]',
+          'organization_name[]', 'organization_country[]'],
+    'C': ['material_ontology', 'species_ontology', 'etag',
+          'gene_bank_country_ontology', 'data_source_type',
+          'data_source_version', 'publication_doi', 'person_initial[]',
+          'person_affiliation[]', 'person_role[]', 'person_role_ontology[]',
+          'organization_role[]', 'organization_role_ontology[]',
+          'organization_address[]', 'organization_country_ontology[]',
+          'organization_uri[]'],
+    'D': ['submission_title', 'submission_description', 'description'],
+}
+
+ORGANISM_WEIGHTS = {
+    'A': ['supplied_breed', 'mapped_breed'],
+    'B': ['efabis_breed_country', 'sex', 'birth_location', 'child_of[]'],
+    'C': ['mapped_breed_ontology', 'sex_ontology', 'birth_location_accuracy',
+          'birth_date', 'birth_date_unit', 'birth_location_longitude',
+          'birth_location_longitude_unit', 'birth_location_latitude',
+          'birth_location_latitude_unit'],
+    'D': [],
+}
+
+SPECIMEN_WEIGHTS = {
+    'A': ['organism_part', 'derived_from'],
+    'B': ['collection_place', 'developmental_stage', 'physiological_stage',
+          'availability'],
+    'C': ['organism_part_ontology', 'collection_place_accuracy',
+          'specimen_collection_protocol', 'collection_date',
+          'collection_date_unit', 'collection_place_latitude',
+          'collection_place_latitude_unit', 'collection_place_longitude',
+          'collection_place_longitude_unit', 'developmental_stage_ontology',
+          'physiological_stage_ontology', 'sample_storage',
+          'sample_storage_processing', 'animal_age_at_collection',
+          'animal_age_at_collection_unit', 'sampling_to_preparation_interval',
+          'sampling_to_preparation_interval_unit'],
+    'D': [],
+}
+
+
+def search_vector_sql(table, weights):
+    """Define a trigger which computes the search_vector column"""
+
+    documents = []
+
+    for weight in ['A', 'B', 'C', 'D']:
+        columns = COMMON_WEIGHTS[weight] + weights[weight]
+        values = []
+
+        for column in columns:
+            # deal with array fields
+            if column.endswith("[]"):
+                values.append(f"array_to_string(NEW.{column[:-2]}, ' ')")
+
+            else:
+                values.append(f"NEW.{column}")
+
+        documents.append(
+            "setweight(to_tsvector('simple', concat_ws(' ', {values})), "
+            "'{weight}')".format(values=", ".join(values), weight=weight))
+
+    return f"""
+CREATE OR REPLACE FUNCTION {table}_search_vector_trigger()
+RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {' || '.join(documents)};
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {table}_search_vector
+    BEFORE INSERT OR UPDATE ON {table}
+    FOR EACH ROW EXECUTE PROCEDURE {table}_search_vector_trigger();
+
+-- compute search vector for existing records
+UPDATE {table} SET search_vector = NULL;
+"""
+
+
+def search_vector_reverse_sql(table):
+    return f"""
+DROP TRIGGER IF EXISTS {table}_search_vector ON {table};
+DROP FUNCTION IF EXISTS {table}_search_vector_trigger();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0020_organismsummary_specimensummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organism',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='specimen',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='organism',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='backend_org_search__f0b964_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='specimen',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='backend_spe_search__6002a3_gin'),
+        ),
+        migrations.RunSQL(
+            search_vector_sql('backend_organism', ORGANISM_WEIGHTS),
+            search_vector_reverse_sql('backend_organism')),
+        migrations.RunSQL(
+            search_vector_sql('backend_specimen', SPECIMEN_WEIGHTS),
+            search_vector_reverse_sql('backend_specimen')),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 2.2.27 on 2026-10-18 15:10
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# an expression index used by case insensitive lookups (Django 'iexact'
+# lookup is translated into 'UPPER(column::text) = UPPER(value)')
+UPPER_INDEX_SQL = """
+CREATE INDEX organism_supplied_breed_upper
+    ON backend_organism (UPPER(supplied_breed::text));
+"""
+
+UPPER_INDEX_REVERSE_SQL = """
+DROP INDEX IF EXISTS organism_supplied_breed_upper;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0021_search_vector'),
+    ]
+
+    operations = [
+        # require superuser privileges if extension is not installed
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='dadislink',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['supplied_breed'], name='dadislink_supplied_breed_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='dadislink',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['most_common_name'], name='dadislink_common_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='dadislink',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['transboundary_name'], name='dadislink_transb_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='organism',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['supplied_breed'], name='organism_supplied_breed_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='organism',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['mapped_breed'], name='organism_mapped_breed_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunSQL(
+            UPPER_INDEX_SQL,
+            UPPER_INDEX_REVERSE_SQL),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 2.2.27 on 2026-10-18 16:05
+
+from django.db import migrations, models
+import django_db_views.migration_functions
+import django_db_views.operations
+
+
+# the old view definition (required to revert this migration)
+ETAG_VIEW_DEFINITION = """SELECT row_number() over () AS id,
+               t1.* FROM (
+                   SELECT data_source_id,
+                          etag
+                     FROM backend_organism UNION
+                   SELECT data_source_id,
+                          etag
+                     FROM backend_specimen) AS t1"""
+
+
+def etag_registry_sql(table, material):
+    """Define a trigger which keeps backend_etag in sync with table"""
+
+    return f"""
+CREATE OR REPLACE FUNCTION {table}_etag_trigger()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+            AND OLD.data_source_id = NEW.data_source_id
+            AND OLD.etag IS NOT DISTINCT FROM NEW.etag THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM backend_etag WHERE data_source_id = OLD.data_source_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO backend_etag (
+            data_source_id, material, etag, last_modified)
+        VALUES (NEW.data_source_id, '{material}', NEW.etag, now())
+        ON CONFLICT (data_source_id) DO UPDATE
+            SET material = EXCLUDED.material,
+                etag = EXCLUDED.etag,
+                last_modified = EXCLUDED.last_modified;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {table}_etag
+    AFTER INSERT OR UPDATE OR DELETE ON {table}
+    FOR EACH ROW EXECUTE PROCEDURE {table}_etag_trigger();
+
+-- register existing records
+INSERT INTO backend_etag (data_source_id, material, etag, last_modified)
+     SELECT data_source_id, '{material}', etag, now()
+       FROM {table}
+ON CONFLICT (data_source_id) DO NOTHING;
+"""
+
+
+def etag_registry_reverse_sql(table):
+    return f"""
+DROP TRIGGER IF EXISTS {table}_etag ON {table};
+DROP FUNCTION IF EXISTS {table}_etag_trigger();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0022_trigram_indexes'),
+    ]
+
+    operations = [
+        # drop the old etag view
+        django_db_views.operations.ViewRunPython(
+            code=django_db_views.migration_functions.BackwardViewMigration('', 'backend_etag'),
+            reverse_code=django_db_views.migration_functions.ForwardViewMigration(ETAG_VIEW_DEFINITION, 'backend_etag'),
+            atomic=False,
+        ),
+        migrations.DeleteModel(
+            name='Etag',
+        ),
+        migrations.CreateModel(
+            name='Etag',
+            fields=[
+                ('data_source_id', models.CharField(max_length=1000, primary_key=True, serialize=False)),
+                ('material', models.CharField(db_index=True, max_length=1000)),
+                ('etag', models.CharField(max_length=1000)),
+                ('last_modified', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'backend_etag',
+                'ordering': ['-data_source_id'],
+            },
+        ),
+        migrations.RunSQL(
+            etag_registry_sql('backend_organism', 'organism'),
+            etag_registry_reverse_sql('backend_organism')),
+        migrations.RunSQL(
+            etag_registry_sql('backend_specimen', 'specimen'),
+            etag_registry_reverse_sql('backend_specimen')),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 2.2.27 on 2026-10-18 17:30
+
+from django.db import migrations, models
+
+
+# tables tracked by a change counter
+VERSIONED_TABLES = [
+    'backend_organism',
+    'backend_specimen',
+    'backend_files',
+    'backend_dadislink',
+    'backend_species2commonname',
+]
+
+DATA_VERSION_SQL = """
+CREATE OR REPLACE FUNCTION backend_dataversion_trigger()
+RETURNS trigger AS $$
+BEGIN
+    UPDATE backend_dataversion
+       SET version = version + 1,
+           last_modified = now()
+     WHERE table_name = TG_TABLE_NAME;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+DATA_VERSION_REVERSE_SQL = """
+DROP FUNCTION IF EXISTS backend_dataversion_trigger();
+"""
+
+
+def data_version_sql(table):
+    """Bump the change counter of table once for each write statement"""
+
+    return f"""
+INSERT INTO backend_dataversion (table_name, version, last_modified)
+     VALUES ('{table}', 0, now());
+
+CREATE TRIGGER {table}_dataversion
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+    FOR EACH STATEMENT EXECUTE PROCEDURE backend_dataversion_trigger();
+"""
+
+
+def data_version_reverse_sql(table):
+    return f"""
+DROP TRIGGER IF EXISTS {table}_dataversion ON {table};
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0023_etag_registry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('table_name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+                ('last_modified', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['table_name'],
+            },
+        ),
+        migrations.RunSQL(
+            DATA_VERSION_SQL,
+            DATA_VERSION_REVERSE_SQL),
+    ] + [
+        migrations.RunSQL(
+            data_version_sql(table),
+            data_version_reverse_sql(table))
+        for table in VERSIONED_TABLES
+    ]
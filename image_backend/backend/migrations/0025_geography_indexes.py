@@ -0,0 +1,33 @@
+# Generated by Django 2.2.27 on 2026-10-18 18:20
+
+from django.db import migrations
+
+
+# functional indexes used by ST_DWithin on geography (distances in meters)
+def geography_index_sql(table):
+    return f"""
+CREATE INDEX {table}_geom_geography
+    ON {table} USING GIST ((geom::geography));
+"""
+
+
+def geography_index_reverse_sql(table):
+    return f"""
+DROP INDEX IF EXISTS {table}_geom_geography;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0024_dataversion'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            geography_index_sql('backend_organism'),
+            geography_index_reverse_sql('backend_organism')),
+        migrations.RunSQL(
+            geography_index_sql('backend_specimen'),
+            geography_index_reverse_sql('backend_specimen')),
+    ]
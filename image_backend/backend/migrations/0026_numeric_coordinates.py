@@ -0,0 +1,130 @@
+# Generated by Django 2.2.27 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+# parse a coordinate from text. Return NULL if value is not a number or
+# is out of range (values which can't be cast, like '1e400', are handled
+# by the definition in migration 0027)
+PARSE_COORDINATE_SQL = r"""
+CREATE OR REPLACE FUNCTION backend_parse_coordinate(
+    value text, bound double precision)
+RETURNS double precision AS $$
+DECLARE
+    result double precision;
+BEGIN
+    IF value !~ '^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?\s*$' THEN
+        RETURN NULL;
+    END IF;
+
+    result := value::double precision;
+
+    IF result < -bound OR result > bound THEN
+        RETURN NULL;
+    END IF;
+
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+"""
+
+PARSE_COORDINATE_REVERSE_SQL = """
+DROP FUNCTION IF EXISTS backend_parse_coordinate(text, double precision);
+"""
+
+
+def coordinates_sql(table, latitude, longitude):
+    """Define a trigger which computes numeric coordinates and geom from
+    text coordinates"""
+
+    return f"""
+CREATE OR REPLACE FUNCTION {table}_coordinates_trigger()
+RETURNS trigger AS $$
+BEGIN
+    NEW.latitude := backend_parse_coordinate(NEW.{latitude}, 90);
+    NEW.longitude := backend_parse_coordinate(NEW.{longitude}, 180);
+
+    IF NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL THEN
+        NEW.geom := ST_SetSRID(
+            ST_MakePoint(NEW.longitude, NEW.latitude), 4326);
+    ELSE
+        NEW.geom := NULL;
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {table}_coordinates
+    BEFORE INSERT OR UPDATE ON {table}
+    FOR EACH ROW EXECUTE PROCEDURE {table}_coordinates_trigger();
+"""
+
+
+def coordinates_reverse_sql(table):
+    return f"""
+DROP TRIGGER IF EXISTS {table}_coordinates ON {table};
+DROP FUNCTION IF EXISTS {table}_coordinates_trigger();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0025_geography_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='organism',
+            name='backend_org_birth_l_d60b7e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='specimen',
+            name='backend_spe_collect_a0a983_idx',
+        ),
+        migrations.AddField(
+            model_name='organism',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='organism',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='specimen',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='specimen',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='organism',
+            index=models.Index(fields=['latitude', 'longitude'], name='backend_org_latitud_60d2ee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='specimen',
+            index=models.Index(fields=['latitude', 'longitude'], name='backend_spe_latitud_2e7916_idx'),
+        ),
+        migrations.RunSQL(
+            PARSE_COORDINATE_SQL,
+            PARSE_COORDINATE_REVERSE_SQL),
+        # existing records are updated with the fillGeom command
+        migrations.RunSQL(
+            coordinates_sql(
+                'backend_organism',
+                'birth_location_latitude',
+                'birth_location_longitude'),
+            coordinates_reverse_sql('backend_organism')),
+        migrations.RunSQL(
+            coordinates_sql(
+                'backend_specimen',
+                'collection_place_latitude',
+                'collection_place_longitude'),
+            coordinates_reverse_sql('backend_specimen')),
+    ]
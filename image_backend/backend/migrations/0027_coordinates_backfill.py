@@ -0,0 +1,70 @@
+# Generated by Django 2.2.27 on 2026-10-19 08:40
+
+from django.db import migrations
+
+
+# parse a coordinate from text. Return NULL if value is not a number or
+# is out of range, even if it can't be represented (like '1e400'): an
+# exception would reject the whole write
+PARSE_COORDINATE_SQL = r"""
+CREATE OR REPLACE FUNCTION backend_parse_coordinate(
+    value text, bound double precision)
+RETURNS double precision AS $$
+DECLARE
+    result double precision;
+BEGIN
+    IF value !~ '^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?\s*$' THEN
+        RETURN NULL;
+    END IF;
+
+    BEGIN
+        result := value::double precision;
+    EXCEPTION WHEN numeric_value_out_of_range THEN
+        RETURN NULL;
+    END;
+
+    IF result < -bound OR result > bound THEN
+        RETURN NULL;
+    END IF;
+
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+"""
+
+
+def backfill_sql(table, latitude, longitude):
+    """Touch text coordinates of existing records: the coordinates trigger
+    fills latitude, longitude and geom"""
+
+    return f"""
+UPDATE {table}
+   SET {latitude} = {latitude}
+ WHERE {latitude} <> '' AND {longitude} <> '';
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0026_numeric_coordinates'),
+    ]
+
+    operations = [
+        # the previous definition is dropped by reverting 0026
+        migrations.RunSQL(
+            PARSE_COORDINATE_SQL,
+            migrations.RunSQL.noop),
+        migrations.RunSQL(
+            backfill_sql(
+                'backend_organism',
+                'birth_location_latitude',
+                'birth_location_longitude'),
+            migrations.RunSQL.noop),
+        migrations.RunSQL(
+            backfill_sql(
+                'backend_specimen',
+                'collection_place_latitude',
+                'collection_place_longitude'),
+            migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 2.2.27 on 2026-10-19 10:15
+
+from django.db import migrations
+
+
+# Data versions are bumped when a transaction commits (by a deferred
+# trigger), not by each write statement: counter rows are locked only while
+# committing, and always in the same order (no deadlocks between writers of
+# different tables). Write statements record the modified tables in a
+# transaction local setting, the first one queues a deferred event
+DATA_VERSION_SQL = """
+CREATE TABLE backend_dataversion_queue (
+    id bigserial PRIMARY KEY
+);
+
+CREATE OR REPLACE FUNCTION backend_dataversion_trigger()
+RETURNS trigger AS $$
+DECLARE
+    tables text := coalesce(
+        current_setting('backend.dataversion_tables', true), '');
+BEGIN
+    IF tables = '' THEN
+        INSERT INTO backend_dataversion_queue DEFAULT VALUES;
+    END IF;
+
+    IF NOT TG_TABLE_NAME = ANY(string_to_array(tables, ',')) THEN
+        PERFORM set_config(
+            'backend.dataversion_tables',
+            concat_ws(',', nullif(tables, ''), TG_TABLE_NAME),
+            true);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION backend_dataversion_commit_trigger()
+RETURNS trigger AS $$
+DECLARE
+    tables text[] := string_to_array(coalesce(
+        current_setting('backend.dataversion_tables', true), ''), ',');
+BEGIN
+    PERFORM 1
+       FROM backend_dataversion
+      WHERE table_name = ANY(tables)
+   ORDER BY table_name
+        FOR UPDATE;
+
+    UPDATE backend_dataversion
+       SET version = version + 1,
+           last_modified = now()
+     WHERE table_name = ANY(tables);
+
+    PERFORM set_config('backend.dataversion_tables', '', true);
+
+    DELETE FROM backend_dataversion_queue WHERE id = NEW.id;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE CONSTRAINT TRIGGER backend_dataversion_queue_commit
+    AFTER INSERT ON backend_dataversion_queue
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE PROCEDURE backend_dataversion_commit_trigger();
+"""
+
+# bump counters with each write statement (like migration 0024)
+DATA_VERSION_REVERSE_SQL = """
+DROP TRIGGER IF EXISTS backend_dataversion_queue_commit
+    ON backend_dataversion_queue;
+DROP FUNCTION IF EXISTS backend_dataversion_commit_trigger();
+DROP TABLE IF EXISTS backend_dataversion_queue;
+
+CREATE OR REPLACE FUNCTION backend_dataversion_trigger()
+RETURNS trigger AS $$
+BEGIN
+    UPDATE backend_dataversion
+       SET version = version + 1,
+           last_modified = now()
+     WHERE table_name = TG_TABLE_NAME;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0027_coordinates_backfill'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            DATA_VERSION_SQL,
+            DATA_VERSION_REVERSE_SQL),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.27 on 2026-10-19 11:02
+
+from django.db import migrations
+
+
+# the etag diff compares accessions by code point (the "C" collation): the
+# primary key index uses the database collation and can't be used by those
+# range scans
+ETAG_INDEX_SQL = """
+CREATE INDEX backend_etag_data_source_id_c
+    ON backend_etag (data_source_id COLLATE "C");
+"""
+
+ETAG_INDEX_REVERSE_SQL = """
+DROP INDEX IF EXISTS backend_etag_data_source_id_c;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0028_deferred_dataversion'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            ETAG_INDEX_SQL,
+            ETAG_INDEX_REVERSE_SQL),
+    ]
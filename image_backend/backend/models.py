@@ -1,9 +1,11 @@
+from django.db import transaction
+from django.db.models import Count
 from django.contrib.gis.db import models
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.http import urlquote
 
-from django_db_views.db_view import DBView
-
 
 # This will be an abstract class inherited by Specimen and Organism model
 # it implements the common attributes in IMAGE-metadata rules
@@ -53,6 +55,15 @@ class BioSampleAbstract(models.Model):
     organization_uri = ArrayField(models.TextField(blank=True), blank=True)
     publication_doi = models.CharField(max_length=1000, blank=True)
 
+    # a weighted document used by full text search. It's maintained by a
+    # database trigger (see migrations)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # numeric coordinates parsed from text fields. Those values and geom are
+    # maintained by a database trigger (see migrations)
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+
     class Meta:
         abstract = True
 
@@ -119,8 +130,8 @@ class Specimen(BioSampleAbstract):
     class Meta:
         ordering = ['-data_source_id']
         indexes = [
-            models.Index(fields=[
-                'collection_place_latitude', 'collection_place_longitude']),
+            models.Index(fields=['latitude', 'longitude']),
+            GinIndex(fields=['search_vector']),
         ]
 
 
@@ -187,6 +198,20 @@ class DADISLink(models.Model):
         unique_together = (
             "species", "supplied_breed", "country")
         ordering = ['-id']
+        indexes = [
+            GinIndex(
+                fields=['supplied_breed'],
+                name='dadislink_supplied_breed_trgm',
+                opclasses=['gin_trgm_ops']),
+            GinIndex(
+                fields=['most_common_name'],
+                name='dadislink_common_name_trgm',
+                opclasses=['gin_trgm_ops']),
+            GinIndex(
+                fields=['transboundary_name'],
+                name='dadislink_transb_name_trgm',
+                opclasses=['gin_trgm_ops']),
+        ]
 
     @classmethod
     def get_instance_from_dict(cls, adict):
@@ -206,16 +231,23 @@ class DADISLink(models.Model):
             self.supplied_breed,
             self.country)
 
+    @staticmethod
+    def get_dadis_url(iso3, common_name, most_common_name):
+        return (
+            "https://fao-dadis-breed-detail.firebaseapp.com/?country="
+            "{iso3}&specie={specie}&breed={breed}"
+        ).format(
+            iso3=urlquote(iso3),
+            specie=urlquote(common_name),
+            breed=urlquote(most_common_name)
+        )
+
     def save(self, *args, **kwargs):
         if self.dadis_url is None or self.dadis_url == '':
-            self.dadis_url = (
-                "https://fao-dadis-breed-detail.firebaseapp.com/?country="
-                "{iso3}&specie={specie}&breed={breed}"
-            ).format(
-                iso3=urlquote(self.iso3),
-                specie=urlquote(self.species.common_name),
-                breed=urlquote(self.most_common_name)
-            )
+            self.dadis_url = self.get_dadis_url(
+                self.iso3,
+                self.species.common_name,
+                self.most_common_name)
 
         # call the base method
         super().save(*args, **kwargs)
@@ -264,30 +296,102 @@ class Organism(BioSampleAbstract):
         indexes = [
             models.Index(fields=['supplied_breed', 'efabis_breed_country']),
             models.Index(fields=['efabis_breed_country']),
-            models.Index(fields=[
-                'birth_location_latitude', 'birth_location_longitude']),
+            models.Index(fields=['latitude', 'longitude']),
+            GinIndex(fields=['search_vector']),
+            # trigram indexes (used by similarity and ILIKE queries)
+            GinIndex(
+                fields=['supplied_breed'],
+                name='organism_supplied_breed_trgm',
+                opclasses=['gin_trgm_ops']),
+            GinIndex(
+                fields=['mapped_breed'],
+                name='organism_mapped_breed_trgm',
+                opclasses=['gin_trgm_ops']),
         ]
 
 
-# using database views to simulate the old etag model. Return etags for
-# both organisms and specimens (used while updating features)
-# https://github.com/BezBartek/django-db-views/blob/master/README.md
-class Etag(DBView):
-    data_source_id = models.CharField(max_length=1000)
-    etag = models.CharField(max_length=1000)
+# Pre-aggregated counts used by summary views. Those tables are kept in sync
+# by database triggers (defined in migrations) every time an organism or a
+# specimen is written: they could be rebuilt from scratch with the
+# 'fillSummary' management command
+class SummaryAbstract(models.Model):
+    total = models.PositiveIntegerField(default=0)
 
-    # Django requires column called id
-    view_definition = """
-        SELECT row_number() over () AS id,
-               t1.* FROM (
-                   SELECT data_source_id,
-                          etag
-                     FROM backend_organism UNION
-                   SELECT data_source_id,
-                          etag
-                     FROM backend_specimen) AS t1
-    """
+    # the model to be summarized and the columns to group by
+    source_model = None
+    facets = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def refresh(cls):
+        """Rebuild the summary table relying on source model"""
+
+        rows = cls.source_model.objects.values(*cls.facets).annotate(
+            count=Count('pk')).order_by()
+
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                [cls(total=row.pop('count'), **row) for row in rows])
+
+        return cls.objects.count()
+
+
+class OrganismSummary(SummaryAbstract):
+    species = models.CharField(max_length=1000)
+    supplied_breed = models.CharField(max_length=1000)
+    sex = models.CharField(max_length=1000)
+    efabis_breed_country = models.CharField(max_length=1000)
+
+    source_model = Organism
+    facets = ('species', 'supplied_breed', 'sex', 'efabis_breed_country')
+
+    class Meta:
+        verbose_name = "Organism summary"
+        verbose_name_plural = "Organism summaries"
+        unique_together = (
+            'species', 'supplied_breed', 'sex', 'efabis_breed_country')
+
+
+class SpecimenSummary(SummaryAbstract):
+    species = models.CharField(max_length=1000)
+    organism_part = models.CharField(max_length=1000)
+
+    source_model = Specimen
+    facets = ('species', 'organism_part')
+
+    class Meta:
+        verbose_name = "Specimen summary"
+        verbose_name_plural = "Specimen summaries"
+        unique_together = ('species', 'organism_part')
+
+
+# a registry of all organisms and specimens with their etags (used while
+# updating features). Records are inserted, updated and deleted by database
+# triggers on backend_organism and backend_specimen (see migration 0023)
+class Etag(models.Model):
+    data_source_id = models.CharField(max_length=1000, primary_key=True)
+    material = models.CharField(max_length=1000, db_index=True)
+    etag = models.CharField(max_length=1000)
+    last_modified = models.DateTimeField()
 
     class Meta:
-        managed = False
         db_table = 'backend_etag'
+        ordering = ['-data_source_id']
+
+
+# a change counter for each table, bumped by database triggers when a
+# transaction which wrote the table commits (see migrations 0024 and 0028).
+# Used to validate cached responses
+class DataVersion(models.Model):
+    table_name = models.CharField(max_length=255, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    last_modified = models.DateTimeField()
+
+    class Meta:
+        ordering = ['table_name']
+
+    def __str__(self):
+        return f"{self.table_name} ({self.version})"
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:24:05 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+
+JSON renderer and parser relying on orjson. Output is the same of the
+django-rest-framework JSONRenderer (compact and utf-8 encoded). When orjson
+is not installed or data can't be encoded by orjson, the standard library
+is used. Floats are the same values, but exponents are written in the
+shortest form ('1e16' instead of '1e+16'). Non finite floats and decimals
+(NaN, Infinity), which are rejected by the strict JSONRenderer with a
+ValueError, are rendered as null
+"""
+
+import codecs
+import decimal
+
+from django.conf import settings
+from django.contrib.gis.geos import GEOSGeometry
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+
+except ImportError:
+    orjson = None
+
+# datetimes in UTC end with 'Z', like in rest_framework.utils.encoders
+ORJSON_OPTIONS = orjson.OPT_UTC_Z if orjson else None
+
+# the utf-8 encoding of line and paragraph separators (escaped by DRF)
+SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+# encoder of the types not supported by orjson
+encoder = JSONEncoder()
+
+
+def default(obj):
+    """
+    Encode the objects not supported by orjson. Decimals are returned as
+    float, geometries as GeoJSON, other types like
+    :py:class:`rest_framework.utils.encoders.JSONEncoder`
+
+    Parameters
+    ----------
+    obj : object
+        An object not supported by orjson.
+
+    Returns
+    -------
+    object
+        A serializable object.
+    """
+
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+
+    if isinstance(obj, GEOSGeometry):
+        return orjson.loads(obj.geojson)
+
+    return encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Render compact JSON with orjson. Indented output (like the browsable
+    API) and non unicode output are rendered by the parent class. Non
+    finite floats are rendered as null (valid JSON), instead of raising
+    ValueError
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+
+        if (orjson is None or indent is not None or self.ensure_ascii or
+                not self.compact):
+            return super().render(
+                data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=default, option=ORJSON_OPTIONS)
+
+        except TypeError:
+            # like not string keys or integers larger than 64 bit
+            return super().render(
+                data, accepted_media_type, renderer_context)
+
+        # output a strict javascript subset, like JSONRenderer
+        for separator, escaped in SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """Parse utf-8 encoded JSON with orjson"""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        if (orjson is None or not self.strict or
+                codecs.lookup(encoding).name != 'utf-8'):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 20:10:41 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+
+A read only representation of querysets which builds serializer data from
+values() rows. Fields are inspected once per serializer, then each row is
+converted by a list of precompiled steps, without calling get_attribute
+and to_representation for each field
+"""
+
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldDoesNotExist
+
+from rest_framework import serializers
+
+from rest_framework_gis.serializers import GeoFeatureModelSerializer
+
+# fields whose representation is str(value)
+STRING_FIELDS = (
+    serializers.CharField,
+    serializers.EmailField,
+    serializers.SlugField,
+    serializers.URLField,
+)
+
+# a field which is not part of the representation (like DRF SkipField)
+SKIP = object()
+
+
+class UnsupportedField(Exception):
+    """A field which can't be represented from values() rows"""
+
+
+def convert_strings(value):
+    """Same as ListField(child=CharField()).to_representation"""
+
+    return [None if item is None else str(item) for item in value]
+
+
+def get_converter(field):
+    """
+    Return a function which converts a not null value like
+    field.to_representation. Simple fields are converted with builtins, the
+    others fall back to the field method
+
+    Parameters
+    ----------
+    field : rest_framework.fields.Field
+        A serializer field.
+
+    Returns
+    -------
+    function
+        The value converter.
+    """
+
+    field_type = type(field)
+
+    if field_type in STRING_FIELDS:
+        return str
+
+    if field_type is serializers.BooleanField:
+        return bool
+
+    if field_type is serializers.IntegerField:
+        return int
+
+    if (field_type is serializers.ListField and
+            type(field.child) in STRING_FIELDS):
+        return convert_strings
+
+    return field.to_representation
+
+
+def value_step(key, convert):
+    def step(row):
+        value = row[key]
+        return None if value is None else convert(value)
+
+    return step
+
+
+def attribute_step(key, attrs, convert):
+    # a dotted source like 'distance.km'
+    def step(row):
+        value = row[key]
+
+        for attr in attrs:
+            if value is None:
+                # an AttributeError is a SkipField for read only fields
+                return SKIP
+
+            value = getattr(value, attr)
+
+        return None if value is None else convert(value)
+
+    return step
+
+
+def hyperlink_step(field, pk_key, lookup_key):
+    # HyperlinkedIdentityField needs an object with 'pk' and the lookup
+    # field as attributes
+    lookup_field = field.lookup_field
+
+    def step(row):
+        obj = SimpleNamespace(pk=row[pk_key])
+
+        if lookup_field != 'pk':
+            setattr(obj, lookup_field, row[lookup_key])
+
+        return field.to_representation(obj)
+
+    return step
+
+
+def nested_step(key, plan):
+    def step(row):
+        return None if row[key] is None else plan.to_representation(row)
+
+    return step
+
+
+class RepresentationPlan():
+    """
+    The precompiled representation of a serializer
+
+    Parameters
+    ----------
+    serializer : rest_framework.serializers.ModelSerializer
+        A serializer instance (fields are already selected).
+    queryset : django.db.models.query.QuerySet
+        The queryset to be represented (annotations are read from it).
+    prefix : str
+        The lookup prefix of a nested serializer (like 'dadis__').
+
+    Raises
+    ------
+    UnsupportedField
+        If a field can't be represented from values() rows.
+    """
+
+    def __init__(self, serializer, queryset, prefix=''):
+        self.serializer = serializer
+        self.model = serializer.Meta.model
+        self.prefix = prefix
+
+        self.annotations = set()
+
+        if not prefix:
+            self.annotations = set(queryset.query.annotations)
+
+        # the primary key is required to paginate with a cursor
+        self.columns = []
+        self.get_key(self.model._meta.pk.name)
+
+        # a list of (field name, step) tuples
+        self.steps = [
+            (field.field_name, self.compile(field, queryset))
+            for field in self.get_fields()
+        ]
+
+        # remove the fields which are never part of the representation
+        self.steps = [
+            (name, step) for name, step in self.steps if step is not SKIP]
+
+    def get_key(self, name):
+        """Return the values() key of a model field"""
+
+        return self.add_column(self.prefix + name)
+
+    def add_column(self, key):
+        """Add a key to the values() columns (once)"""
+
+        if key not in self.columns:
+            self.columns.append(key)
+
+        return key
+
+    def get_fields(self):
+        """The fields of a representation (ModelSerializer order)"""
+
+        return [
+            field for field in self.serializer.fields.values()
+            if not field.write_only]
+
+    def compile(self, field, queryset):
+        """Return a function which represents a field of a row"""
+
+        if isinstance(field, serializers.HyperlinkedIdentityField):
+            pk_name = self.model._meta.pk.name
+            lookup_name = field.lookup_field
+
+            if lookup_name == 'pk':
+                lookup_name = pk_name
+
+            return hyperlink_step(
+                field, self.get_key(pk_name), self.get_key(lookup_name))
+
+        if field.source == '*' or field.source_attrs[0] == 'pk':
+            raise UnsupportedField(field.field_name)
+
+        name, attrs = field.source_attrs[0], field.source_attrs[1:]
+
+        if name in self.annotations:
+            if not attrs:
+                return value_step(self.get_key(name), get_converter(field))
+
+            if field.required:
+                raise UnsupportedField(field.field_name)
+
+            return attribute_step(
+                self.get_key(name), attrs, get_converter(field))
+
+        try:
+            model_field = self.model._meta.get_field(name)
+
+        except FieldDoesNotExist:
+            if not field.required and not self.prefix:
+                # a missing annotation (like distance without a point)
+                return SKIP
+
+            raise UnsupportedField(field.field_name)
+
+        if attrs or model_field.many_to_many or model_field.one_to_many:
+            raise UnsupportedField(field.field_name)
+
+        if isinstance(field, serializers.ModelSerializer):
+            plan = RepresentationPlan(
+                field, queryset, prefix=self.prefix + name + '__')
+            for column in plan.columns:
+                self.add_column(column)
+
+            return nested_step(self.get_key(name), plan)
+
+        if isinstance(field, serializers.BaseSerializer):
+            raise UnsupportedField(field.field_name)
+
+        if model_field.is_relation:
+            # a related field needs an instance (or a PKOnlyObject)
+            raise UnsupportedField(field.field_name)
+
+        return value_step(self.get_key(name), get_converter(field))
+
+    def to_representation(self, row):
+        """Same as ModelSerializer.to_representation"""
+
+        ret = OrderedDict()
+
+        for name, step in self.steps:
+            value = step(row)
+
+            if value is not SKIP:
+                ret[name] = value
+
+        return ret
+
+    def to_representation_many(self, rows):
+        """Same as ListSerializer.to_representation"""
+
+        to_representation = self.to_representation
+
+        return [to_representation(row) for row in rows]
+
+
+class GeoRepresentationPlan(RepresentationPlan):
+    """
+    The precompiled representation of a GeoFeatureModelSerializer: id and
+    geometry are represented as feature attributes, other fields as
+    properties (bounding boxes are not supported)
+    """
+
+    def __init__(self, serializer, queryset, prefix=''):
+        meta = serializer.Meta
+
+        if meta.auto_bbox or meta.bbox_geo_field:
+            raise UnsupportedField(meta.bbox_geo_field or 'bbox')
+
+        self.id_field = meta.id_field
+        self.geo_field = meta.geo_field
+
+        super().__init__(serializer, queryset, prefix)
+
+        self.id_step = self.feature_step(self.id_field)
+        self.geo_step = self.feature_step(self.geo_field)
+
+    def feature_step(self, name):
+        # id and geometry are converted even if they are None
+        if name is None:
+            return None
+
+        field = self.serializer.fields[name]
+        key = self.get_key(field.source)
+        convert = field.to_representation
+
+        return lambda row: convert(row[key])
+
+    def get_fields(self):
+        return [
+            field for field in super().get_fields()
+            if field.field_name not in (self.id_field, self.geo_field)]
+
+    def to_representation(self, row):
+        """Same as GeoFeatureModelSerializer.to_representation"""
+
+        feature = OrderedDict()
+
+        if self.id_step:
+            feature["id"] = self.id_step(row)
+
+        feature["type"] = "Feature"
+        feature["geometry"] = self.geo_step(row)
+        feature["properties"] = super().to_representation(row)
+
+        return feature
+
+    def to_representation_many(self, rows):
+        """Same as GeoFeatureModelListSerializer.to_representation"""
+
+        return OrderedDict((
+            ("type", "FeatureCollection"),
+            ("features", super().to_representation_many(rows)),
+        ))
+
+
+def get_plan(serializer, queryset):
+    """
+    Compile the representation of a serializer
+
+    Parameters
+    ----------
+    serializer : rest_framework.serializers.ModelSerializer
+        A serializer instance.
+    queryset : django.db.models.query.QuerySet
+        The queryset to be represented.
+
+    Returns
+    -------
+    RepresentationPlan
+        A plan or None if the serializer is not supported.
+    """
+
+    plan_class = RepresentationPlan
+
+    if isinstance(serializer, GeoFeatureModelSerializer):
+        plan_class = GeoRepresentationPlan
+
+    try:
+        return plan_class(serializer, queryset)
+
+    except UnsupportedField:
+        return None
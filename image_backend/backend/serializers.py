@@ -1,9 +1,12 @@
 
 from collections import OrderedDict
+from urllib.parse import quote
 
-from django.contrib.gis.geos import Point
+from django.urls import NoReverseMatch
+from django.utils.http import RFC3986_SUBDELIMS
 
 from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
 from rest_framework.fields import SkipField
 from rest_framework.utils import model_meta
 
@@ -11,15 +14,188 @@ from rest_framework_gis.serializers import GeoFeatureModelSerializer
 
 from .models import (
     Specimen, Organism, Files, Species2CommonName, DADISLink, Etag)
+from .lookups import get_species, get_or_create_link
+
+# columns computed by a database trigger from text coordinates
+COORDINATE_FIELDS = ['geom', 'latitude', 'longitude']
+
+
+def get_selected_fields(query_params, available):
+    """
+    Read 'fields' or 'omit' (comma separated field names) from query params
+    and return the selected field names
+
+    Parameters
+    ----------
+    query_params : django.http.request.QueryDict
+        The GET parameters of a request.
+    available : list
+        The field names of a serializer.
+
+    Raises
+    ------
+    rest_framework.exceptions.ValidationError
+        If a field name doesn't exist.
+
+    Returns
+    -------
+    set
+        The selected field names (or None if all fields are selected).
+    """
+
+    selected = None
+
+    for param in ('fields', 'omit'):
+        value = query_params.get(param, None)
+
+        if not value:
+            continue
+
+        names = set(name.strip() for name in value.split(",") if name.strip())
+        unknown = names - set(available)
+
+        if unknown:
+            raise ValidationError({
+                param: "Unknown fields: {names}".format(
+                    names=", ".join(sorted(unknown)))})
+
+        if param == 'fields':
+            selected = names
+
+        else:
+            selected = (selected or set(available)) - names
+
+    return selected
+
+
+def get_dadis_link(dadis_data):
+    """
+    Get or create a DADISLink from the nested data of a serializer. Species
+    and links are read from the lookup cache (see :py:mod:`backend.lookups`)
+
+    Parameters
+    ----------
+    dadis_data : dict
+        The validated data of a DADISLinkSerializer (with species).
+
+    Returns
+    -------
+    backend.models.DADISLink
+        A DADISLink instance.
+    """
+
+    dadis_data = dict(dadis_data)
+    species = get_species(**dadis_data.pop('species'))
+
+    dadis, _ = get_or_create_link(species, **dadis_data)
+
+    return dadis
+
+
+def refresh_coordinates(instance):
+    """Read geom and numeric coordinates of a saved instance, which are
+    computed by a database trigger from text coordinates (see migrations
+    0026 and 0027)"""
+
+    instance.refresh_from_db(fields=COORDINATE_FIELDS)
+
+
+class DynamicFieldsMixin():
+    """
+    Return only the fields selected with 'fields' or 'omit' query params
+    (read operations only)
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get('request', None)
+
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return
+
+        selected = get_selected_fields(request.query_params, self.fields)
+
+        if selected is None:
+            return
+
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+
+class TemplateHyperlinkedIdentityField(
+        serializers.HyperlinkedIdentityField):
+    """
+    A HyperlinkedIdentityField which resolves its route once per request,
+    using a placeholder as lookup value. The url of each object is the
+    template with the quoted lookup value (like django reverse). Values
+    which could not match the route are reversed as usual
+    """
+
+    # placeholders for str (or regex) and int path converters
+    placeholders = ('lookup_value', '9081726354453627189')
+
+    # the safe characters of django reverse
+    safe = RFC3986_SUBDELIMS + '/~:@'
+
+    def get_url_template(self, view_name, request, format):
+        """Return (template, placeholder) or (None, None) for a request"""
+
+        cached = getattr(self, '_url_template', None)
+
+        if cached and cached[0] is request and cached[1] == format:
+            return cached[2]
+
+        template = (None, None)
+
+        for placeholder in self.placeholders:
+            kwargs = {self.lookup_url_kwarg: placeholder}
+
+            try:
+                url = self.reverse(
+                    view_name, kwargs=kwargs, request=request, format=format)
+
+            except NoReverseMatch:
+                continue
+
+            if url.count(placeholder) == 1:
+                template = (url, placeholder)
+
+            break
+
+        self._url_template = (request, format, template)
+
+        return template
+
+    def get_url(self, obj, view_name, request, format):
+        # Unsaved objects will not yet have a valid URL.
+        if hasattr(obj, 'pk') and obj.pk in (None, ''):
+            return None
+
+        template, placeholder = self.get_url_template(
+            view_name, request, format)
+
+        value = str(getattr(obj, self.lookup_field))
+
+        if (template is None or not value or '/' in value or '.' in value or
+                (placeholder.isdigit() and not (
+                    value.isascii() and value.isdigit()))):
+            return super().get_url(obj, view_name, request, format)
+
+        return template.replace(
+            placeholder, quote(value, safe=self.safe))
 
 
 class EtagSerializer(serializers.ModelSerializer):
     class Meta:
-        # this will return data from a database view
+        # this will return data from a registry maintained by triggers
         model = Etag
         fields = (
             'data_source_id',
-            'etag'
+            'material',
+            'etag',
+            'last_modified'
         )
 
 
@@ -30,59 +206,30 @@ class FilesSerializer(serializers.ModelSerializer):
                   'file_checksum', 'file_checksum_method')
 
 
-class SpecimenSerializer(serializers.ModelSerializer):
-    url = serializers.HyperlinkedIdentityField(
+class SpecimenSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    url = TemplateHyperlinkedIdentityField(
         view_name='backend:specimendetail',
         lookup_field='data_source_id'
     )
 
     class Meta:
         model = Specimen
-        fields = '__all__'
+        exclude = ['search_vector', 'latitude', 'longitude']
         read_only_fields = ['geom']
 
-    def check_coordinates(self, validated_data):
-        geom = None
-
-        lng = validated_data.get('collection_place_longitude')
-        lat = validated_data.get('collection_place_latitude')
-
-        if lng and lat:
-            try:
-                lng = float(lng)
-                lat = float(lat)
-
-            except ValueError:
-                # I can't make a point
-                return geom
-
-            geom = Point(lng, lat, srid=4326)
-
-        return geom
-
     def create(self, validated_data):
-        # check coordinates
-        geom = self.check_coordinates(validated_data)
+        specimen = Specimen.objects.create(**validated_data)
 
-        specimen = Specimen.objects.create(
-            geom=geom,
-            **validated_data
-        )
+        # read the coordinates computed by the database trigger
+        refresh_coordinates(specimen)
 
         return specimen
 
     def update(self, instance, validated_data):
-        """Override the default update method to update geom data"""
-
         instance = super().update(instance, validated_data)
 
-        # check coordinates
-        geom = self.check_coordinates(validated_data)
-
-        if geom:
-            # update geom coordinates
-            instance.geom = geom
-            instance.save()
+        # read the coordinates computed by the database trigger
+        refresh_coordinates(instance)
 
         return instance
 
@@ -121,7 +268,7 @@ class GeoMaterialMixin():
 
 
 class GeoSpecimenSerializer(GeoMaterialMixin, GeoFeatureModelSerializer):
-    url = serializers.HyperlinkedIdentityField(
+    url = TemplateHyperlinkedIdentityField(
         view_name='backend:geospecimen_detail',
         lookup_field='data_source_id'
     )
@@ -167,7 +314,7 @@ class Species2CommonNameSerializer(serializers.ModelSerializer):
 class DADISLinkSerializer(serializers.HyperlinkedModelSerializer):
     species = Species2CommonNameSerializer(many=False, read_only=False)
 
-    url = serializers.HyperlinkedIdentityField(
+    url = TemplateHyperlinkedIdentityField(
         view_name='backend:dadis_link-detail',
         lookup_field='pk'
     )
@@ -189,44 +336,25 @@ class DADISLinkSerializer(serializers.HyperlinkedModelSerializer):
 
     def create(self, validated_data):
         species = validated_data.pop('species')
-        species_obj = Species2CommonName.objects.get(**species)
+        species_obj = get_species(**species)
         dadis = DADISLink.objects.create(species=species_obj, **validated_data)
 
         return dadis
 
 
-class OrganismSerializer(serializers.ModelSerializer):
+class OrganismSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     dadis = DADISLinkSerializer(many=False, required=False, allow_null=True)
 
-    url = serializers.HyperlinkedIdentityField(
+    url = TemplateHyperlinkedIdentityField(
         view_name='backend:organismdetail',
         lookup_field='data_source_id'
     )
 
     class Meta:
         model = Organism
-        fields = '__all__'
+        exclude = ['search_vector', 'latitude', 'longitude']
         read_only_fields = ['dadis', 'geom']
 
-    def check_coordinates(self, validated_data):
-        geom = None
-
-        lng = validated_data.get('birth_location_longitude')
-        lat = validated_data.get('birth_location_latitude')
-
-        if lng and lat:
-            try:
-                lng = float(lng)
-                lat = float(lat)
-
-            except ValueError:
-                # I can't make a point
-                return geom
-
-            geom = Point(lng, lat, srid=4326)
-
-        return geom
-
     def create(self, validated_data):
         # need to get cut the dadis attribute
         dadis_data = validated_data.pop('dadis', None)
@@ -234,20 +362,16 @@ class OrganismSerializer(serializers.ModelSerializer):
 
         # create a new DADIS object
         if dadis_data:
-            species = dadis_data.pop('species')
-            species_obj = Species2CommonName.objects.get(**species)
-            dadis, _ = DADISLink.objects.get_or_create(
-                species=species_obj, **dadis_data)
-
-        # check coordinates
-        geom = self.check_coordinates(validated_data)
+            dadis = get_dadis_link(dadis_data)
 
         organism = Organism.objects.create(
             dadis=dadis,
-            geom=geom,
             **validated_data
         )
 
+        # read the coordinates computed by the database trigger
+        refresh_coordinates(organism)
+
         return organism
 
     def update(self, instance, validated_data):
@@ -269,33 +393,25 @@ class OrganismSerializer(serializers.ModelSerializer):
             else:
                 setattr(instance, attr, value)
 
-        instance.save()
-
         # create a new DADIS object if necessary and update instance
         if dadis_data:
-            species = dadis_data.pop('species')
-            species_obj = Species2CommonName.objects.get(**species)
-
             # get or create a DADis object
-            dadis, _ = DADISLink.objects.get_or_create(
-                species=species_obj, **dadis_data)
+            dadis = get_dadis_link(dadis_data)
 
             # track relationship with dadis
             instance.dadis = dadis
-            instance.save()
 
-        # check coordinates
-        geom = self.check_coordinates(validated_data)
+        # write all changes with a single save
+        instance.save()
 
-        if geom:
-            instance.geom = geom
-            instance.save()
+        # read the coordinates computed by the database trigger
+        refresh_coordinates(instance)
 
         return instance
 
 
 class GeoOrganismSerializer(GeoMaterialMixin, GeoFeatureModelSerializer):
-    url = serializers.HyperlinkedIdentityField(
+    url = TemplateHyperlinkedIdentityField(
         view_name='backend:geoorganism_detail',
         lookup_field='data_source_id'
     )
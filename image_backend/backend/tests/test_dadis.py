@@ -12,6 +12,7 @@ from rest_framework import status
 from rest_framework.test import APITestCase
 from rest_framework.reverse import reverse as api_reverse
 
+from ..lookups import cache, get_species, get_or_create_link
 from ..models import DADISLink
 
 User = get_user_model()
@@ -45,3 +46,37 @@ class DADISLinkTestCase(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(DADISLink.objects.count(), 1)
+
+    def test_lookup_cache(self):
+        cache.clear()
+
+        species = get_species(
+            scientific_name="Bos taurus", common_name="Cattle")
+
+        link, created = get_or_create_link(
+            species, supplied_breed="Asturiana de los Valles",
+            country="Spain", iso3="ESP")
+        self.assertTrue(created)
+
+        # new links are cached when committed: read it again
+        get_or_create_link(
+            species, supplied_breed="Asturiana de los Valles",
+            country="Spain", iso3="ESP")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_species(
+                    scientific_name="Bos taurus", common_name="Cattle"),
+                species)
+
+            self.assertEqual(
+                get_or_create_link(
+                    species, supplied_breed="Asturiana de los Valles",
+                    country="Spain", iso3="ESP"),
+                (link, False))
+
+        # writes invalidate cache
+        link.most_common_name = "Asturiana de los Valles"
+        link.save()
+
+        self.assertEqual(cache.links, {})
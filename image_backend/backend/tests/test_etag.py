@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:02:44 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+"""
+
+import gzip
+import json
+
+from django.contrib.auth import get_user_model
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework.reverse import reverse as api_reverse
+
+User = get_user_model()
+
+
+class EtagSnapshotTestCase(APITestCase):
+    fixtures = [
+        "backend/organism",
+        "backend/specimen"
+    ]
+
+    def setUp(self):
+        self.url = api_reverse("backend:etag-snapshot")
+
+    def test_snapshot(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(sorted(content.splitlines()), [
+            'SAMEA7044739\t"""05f84a0e31397eae686396439fcc22181"""',
+            'SAMEA7044752\t"""0609362c38f0d75d3e3260e03f14a5ec6"""',
+        ])
+
+    def test_snapshot_ndjson(self):
+        response = self.client.get(
+            self.url, {
+                'file_format': 'ndjson',
+                'compression': 'gzip',
+                'material': 'organism'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+
+        content = gzip.decompress(b"".join(response.streaming_content))
+        self.assertEqual(
+            [json.loads(line) for line in content.splitlines()],
+            [{
+                "data_source_id": "SAMEA7044752",
+                "etag": '"0609362c38f0d75d3e3260e03f14a5ec6"'
+            }])
+
+
+class EtagDiffTestCase(APITestCase):
+    fixtures = [
+        "backend/organism",
+        "backend/specimen"
+    ]
+
+    def setUp(self):
+        user = User.objects.create(username="test", email="test")
+        user.set_password("password")
+        user.save()
+
+        self.client.login(username="test", password="password")
+
+        self.url = api_reverse("backend:etag-diff")
+
+    def test_read_only(self):
+        url = api_reverse("backend:etag-list")
+
+        response = self.client.post(
+            url, {"data_source_id": "SAMEA0000001", "etag": '"new"'},
+            format="json")
+        self.assertEqual(
+            response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        url = api_reverse("backend:etag-detail", args=["SAMEA7044752"])
+
+        response = self.client.delete(url)
+        self.assertEqual(
+            response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_diff(self):
+        data = {
+            "etags": [
+                ["SAMEA7044752", '"0609362c38f0d75d3e3260e03f14a5ec6"'],
+                ["SAMEA7044739", '"changed"'],
+                ["SAMEA0000001", '"new"'],
+            ]
+        }
+
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            "new": ["SAMEA0000001"],
+            "changed": ["SAMEA7044739"],
+            "missing": []
+        })
+
+    def test_diff_missing(self):
+        response = self.client.post(self.url, {"etags": []}, format="json")
+        self.assertEqual(
+            response.data["missing"], ["SAMEA7044739", "SAMEA7044752"])
+
+        # limit missing accessions to a range
+        response = self.client.post(
+            self.url,
+            {"etags": [], "after": "SAMEA7044739", "until": "SAMEA7044800"},
+            format="json")
+        self.assertEqual(response.data["missing"], ["SAMEA7044752"])
+
+    def test_diff_errors(self):
+        response = self.client.post(
+            self.url, {"etags": [["SAMEA7044752"]]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            self.url,
+            {"etags": [["SAMEA7044752", "etag"]], "until": "SAMEA7044739"},
+            format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_diff_anonymous(self):
+        self.client.logout()
+
+        response = self.client.post(self.url, {"etags": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
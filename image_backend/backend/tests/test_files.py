@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 12:02:53 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+"""
+
+import gzip
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework.reverse import reverse as api_reverse
+
+from ..models import Files
+
+
+class FilesDownloadTestCase(APITestCase):
+    fixtures = [
+        "backend/specimen"
+    ]
+
+    def setUp(self):
+        Files.objects.create(
+            data_source_id="SAMEA7044739",
+            file_name=["test.vcf.gz", "test.vcf.gz.tbi"],
+            file_url=[
+                "ftp.sra.ebi.ac.uk/vol1/ERZ123/test.vcf.gz",
+                "ftp.sra.ebi.ac.uk/vol1/ERZ123/test.vcf.gz.tbi"],
+            file_size=["1 MB", "1 kB"],
+            file_checksum=["a" * 32, "b" * 32],
+            file_checksum_method=["md5", "md5"]
+        )
+
+    def test_download(self):
+        url = api_reverse("backend:file_download")
+        response = self.client.get(url, {'species': 'Gallus gallus'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        # header and one line for each file
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(
+            lines[1].split("\t"),
+            ["SAMEA7044739", "test.vcf.gz",
+             "ftp.sra.ebi.ac.uk/vol1/ERZ123/test.vcf.gz", "1 MB", "a" * 32,
+             "md5"])
+
+    def test_manifest(self):
+        url = api_reverse("backend:file_download")
+        response = self.client.get(
+            url, {'data_source_id': 'SAMEA7044739', 'file_format': 'manifest'})
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(
+            lines,
+            ["ftp://ftp.sra.ebi.ac.uk/vol1/ERZ123/test.vcf.gz\t" + "a" * 32,
+             "ftp://ftp.sra.ebi.ac.uk/vol1/ERZ123/test.vcf.gz.tbi\t" +
+             "b" * 32])
+
+    def test_null_elements(self):
+        # array elements could be NULL: they are exported as empty strings
+        Files.objects.filter(data_source_id="SAMEA7044739").update(
+            file_checksum=["a" * 32, None],
+            file_checksum_method=["md5", None])
+
+        url = api_reverse("backend:file_download")
+
+        response = self.client.get(
+            url, {'data_source_id': 'SAMEA7044739', 'file_format': 'manifest'})
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(
+            lines,
+            ["ftp://ftp.sra.ebi.ac.uk/vol1/ERZ123/test.vcf.gz\t" + "a" * 32,
+             "ftp://ftp.sra.ebi.ac.uk/vol1/ERZ123/test.vcf.gz.tbi\t"])
+
+        # the whole compressed stream is returned
+        response = self.client.get(
+            url, {'data_source_id': 'SAMEA7044739', 'compression': 'gzip'})
+
+        lines = gzip.decompress(
+            b"".join(response.streaming_content)).decode().splitlines()
+
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(
+            lines[2].split("\t"),
+            ["SAMEA7044739", "test.vcf.gz.tbi",
+             "ftp.sra.ebi.ac.uk/vol1/ERZ123/test.vcf.gz.tbi", "1 kB", "", ""])
+
+    def test_filter_species(self):
+        url = api_reverse("backend:file_download")
+        response = self.client.get(url, {'species': 'Bos taurus'})
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        # only header
+        self.assertEqual(len(lines), 1)
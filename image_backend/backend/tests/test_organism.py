@@ -6,16 +6,32 @@ Created on Mon Jul  6 15:34:11 2020
 @author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
 """
 
+import io
 import os
+import types
+import gzip
 import json
 
+from decimal import Decimal
+
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.geos import Point
 
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.relations import HyperlinkedIdentityField
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APITestCase, APIRequestFactory
 from rest_framework.reverse import reverse as api_reverse
 
-from ..models import Organism
+from ..models import Organism, Etag, DataVersion
+from ..renderers import ORJSONRenderer, ORJSONParser
+from ..representation import get_plan
+from ..serializers import (
+    OrganismSerializer, GeoOrganismSerializer,
+    TemplateHyperlinkedIdentityField)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -27,6 +43,29 @@ class CommonMixin():
         "backend/organism"
     ]
 
+    def assertSameRepresentation(self, serializer_class, queryset, params={}):
+        """Compare serializer data with a precompiled representation"""
+
+        request = Request(APIRequestFactory().get('/backend/', params))
+        context = {'request': request, 'format': None, 'view': None}
+
+        expected = serializer_class(
+            list(queryset), many=True, context=context).data
+
+        plan = get_plan(serializer_class(context=context), queryset)
+        self.assertIsNotNone(plan)
+
+        data = plan.to_representation_many(queryset.values(*plan.columns))
+
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(expected), renderer.render(data))
+
+    def fire_deferred_triggers(self):
+        """Data versions are bumped by deferred triggers when a transaction
+        commits, while test cases are never committed"""
+
+        connection.check_constraints()
+
     def setUp(self):
         user = User.objects.create(username="test", email="test")
         user.set_password("password")
@@ -85,6 +124,113 @@ class OrganismTestCase(CommonMixin, APITestCase):
         response = self.client.put(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_unrepresentable_coordinates(self):
+        organism = Organism.objects.get(pk="SAMEA7044752")
+        organism.birth_location_latitude = "1e400"
+        organism.save()
+
+        # coordinates which can't be cast are ignored
+        organism.refresh_from_db()
+        self.assertIsNone(organism.latitude)
+        self.assertIsNone(organism.geom)
+
+    def test_serializer_coordinates(self):
+        organism = Organism.objects.get(pk="SAMEA7044752")
+
+        # serializers return the coordinates computed by the database
+        for latitude in ["nan", "inf", "1_0", "91"]:
+            serializer = OrganismSerializer(
+                organism,
+                data={'birth_location_latitude': latitude},
+                partial=True)
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+            instance = serializer.save()
+            self.assertIsNone(instance.latitude)
+            self.assertIsNone(instance.geom)
+
+        serializer = OrganismSerializer(
+            organism,
+            data={
+                'birth_location_latitude': "45.0",
+                'birth_location_longitude': "9.0"},
+            partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        instance = serializer.save()
+        self.assertEqual(instance.latitude, 45.0)
+        self.assertEqual(instance.geom, Point(9.0, 45.0, srid=4326))
+
+    def test_bulk_write(self):
+        url = api_reverse("backend:organism_bulk")
+
+        with open(os.path.join(BASE_DIR, "data/SAMEA7044752.json")) as handle:
+            data = json.load(handle)
+
+        # records with the same etag are not written (data versions are
+        # not changed)
+        version = DataVersion.objects.get(table_name="backend_organism")
+
+        response = self.client.post(
+            url, [dict(data, dadis=self.dadis)], format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["unchanged"], 1)
+
+        self.fire_deferred_triggers()
+        self.assertEqual(
+            DataVersion.objects.get(table_name="backend_organism").version,
+            version.version)
+
+        # update a record, create a new one and submit an invalid one
+        data["supplied_breed"] = "Updated breed"
+        data["etag"] = '"updated etag"'
+        data["dadis"] = self.dadis
+
+        new = dict(data, data_source_id="SAMEA0000001")
+        new.pop("dadis")
+
+        invalid = dict(data, data_source_id="SAMEA0000002")
+        invalid.pop("species")
+
+        response = self.client.post(
+            url, [data, new, invalid, new], format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["updated"], 1)
+        self.assertEqual(response.data["error"], 2)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["updated", "created", "error", "error"])
+        self.assertIn("species", response.data["results"][2]["errors"])
+
+        organism = Organism.objects.get(pk="SAMEA7044752")
+        self.assertEqual(organism.supplied_breed, "Updated breed")
+        self.assertEqual(organism.dadis.iso3, "ESP")
+        self.assertEqual(organism.etag, data["etag"])
+
+        # geom is computed by database
+        organism = Organism.objects.get(pk="SAMEA0000001")
+        self.assertIsNone(organism.dadis)
+        self.assertIsNotNone(organism.geom)
+
+        # a DADIS link with an unknown species is an error
+        unknown = dict(data, etag='"unknown species"')
+        unknown["dadis"] = dict(self.dadis, species={
+            "scientific_name": "Foo bar", "common_name": "Foo"})
+
+        response = self.client.post(url, [unknown], format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["status"], "error")
+        self.assertEqual(
+            Organism.objects.get(pk="SAMEA7044752").etag, data["etag"])
+
+        response = self.client.post(url, {"foo": "bar"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.logout()
+        response = self.client.post(url, [new], format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_get_organism(self):
         url = api_reverse("backend:organismindex")
         response = self.client.get(url)
@@ -92,6 +238,316 @@ class OrganismTestCase(CommonMixin, APITestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]['data_source_id'], "SAMEA7044752")
 
+    def test_coordinates(self):
+        organism = Organism.objects.get(pk="SAMEA7044752")
+        self.assertEqual(organism.latitude, 51.0)
+        self.assertEqual(organism.longitude, 10.0)
+
+        # geom is maintained by database for every write
+        Organism.objects.update(birth_location_latitude="not a number")
+        organism.refresh_from_db()
+        self.assertIsNone(organism.latitude)
+        self.assertIsNone(organism.geom)
+
+        Organism.objects.update(birth_location_latitude=" 45.5 ")
+        organism.refresh_from_db()
+        self.assertEqual(organism.geom.coords, (10.0, 45.5))
+
+        url = api_reverse("backend:organismindex")
+        response = self.client.get(url, {'latitude__gte': 45})
+        self.assertEqual(len(response.data["results"]), 1)
+
+        response = self.client.get(url, {'latitude__lte': 45})
+        self.assertEqual(len(response.data["results"]), 0)
+
+    def test_sparse_fields(self):
+        url = api_reverse("backend:organismindex")
+
+        response = self.client.get(
+            url, {'fields': 'data_source_id,species,dadis'})
+        self.assertEqual(
+            sorted(response.data["results"][0].keys()),
+            ['dadis', 'data_source_id', 'species'])
+
+        response = self.client.get(url, {'omit': 'dadis,url'})
+        result = response.data["results"][0]
+        self.assertNotIn('dadis', result)
+        self.assertNotIn('url', result)
+        self.assertIn('supplied_breed', result)
+
+        response = self.client.get(url, {'fields': 'foo'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        url = api_reverse(
+            "backend:organismdetail", args=["SAMEA7044752"])
+        response = self.client.get(url, {'fields': 'url,supplied_breed'})
+        self.assertEqual(
+            sorted(response.data.keys()), ['supplied_breed', 'url'])
+
+    def test_etag_registry(self):
+        etag = Etag.objects.get(data_source_id="SAMEA7044752")
+        self.assertEqual(etag.material, "organism")
+        self.assertEqual(etag.etag, '"0609362c38f0d75d3e3260e03f14a5ec6"')
+
+        url = api_reverse(
+            "backend:etag-detail",
+            kwargs={"data_source_id": "SAMEA7044752"})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["etag"], etag.etag)
+
+        # registry is updated when organism is deleted
+        Organism.objects.all().delete()
+        self.assertEqual(Etag.objects.count(), 0)
+
+    def test_representation_plan(self):
+        queryset = Organism.objects.select_related("dadis", "dadis__species")
+        self.assertSameRepresentation(OrganismSerializer, queryset)
+
+        # add a DADIS link (a nested object) and select fields
+        with open(os.path.join(BASE_DIR, "data/SAMEA7044752.json")) as handle:
+            data = json.load(handle)
+
+        data["dadis"] = self.dadis
+
+        url = api_reverse(
+            "backend:organismdetail", args=["SAMEA7044752"])
+        self.client.put(url, data, format="json")
+        self.assertIsNotNone(queryset.get().dadis)
+
+        self.assertSameRepresentation(OrganismSerializer, queryset)
+        self.assertSameRepresentation(
+            OrganismSerializer, queryset, {'fields': 'url,dadis,child_of'})
+
+    def test_url_template(self):
+        # urls depend on forwarded headers
+        request = Request(APIRequestFactory().get(
+            '/backend/organism/',
+            HTTP_X_FORWARDED_HOST='example.org',
+            HTTP_X_FORWARDED_PROTO='https'))
+
+        for view_name, lookup_field, values in [
+                ('backend:organismdetail', 'data_source_id',
+                 ["SAMEA7044752", "a b%c", "àè:@~", "x.y", "id?q=1"]),
+                ('backend:dadis_link-detail', 'pk', [1, 42, "07"])]:
+
+            reference = HyperlinkedIdentityField(
+                view_name=view_name, lookup_field=lookup_field)
+            field = TemplateHyperlinkedIdentityField(
+                view_name=view_name, lookup_field=lookup_field)
+
+            for value in values:
+                obj = types.SimpleNamespace(pk=value)
+                setattr(obj, lookup_field, value)
+
+                expected = reference.get_url(obj, view_name, request, None)
+                self.assertEqual(
+                    field.get_url(obj, view_name, request, None), expected)
+                self.assertTrue(expected.startswith("https://example.org/"))
+
+    def test_orjson_renderer(self):
+        url = api_reverse("backend:organismindex")
+        response = self.client.get(url)
+
+        # orjson is the default renderer
+        content = ORJSONRenderer().render(response.data)
+        self.assertEqual(response.content, content)
+        self.assertEqual(JSONRenderer().render(response.data), content)
+
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(content)), json.loads(content))
+
+    def test_orjson_floats(self):
+        finite = [0.1, 1e16, 1e-7, 123456789.123, Decimal("1.10"),
+                  Decimal("-0.5")]
+
+        # the same values of the parent renderer
+        content = ORJSONRenderer().render({'values': finite})
+        self.assertEqual(
+            json.loads(content), json.loads(JSONRenderer().render(
+                {'values': finite})))
+        self.assertEqual(
+            json.loads(content)['values'][4:], [1.1, -0.5])
+
+        # non finite values are rendered as null, while the strict parent
+        # renderer raises
+        values = [float("nan"), float("inf"), -float("inf"),
+                  Decimal("NaN"), Decimal("Infinity")]
+
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({'values': values})
+
+        self.assertEqual(
+            ORJSONRenderer().render({'values': values}),
+            b'{"values":[null,null,null,null,null]}')
+
+    def test_conditional_get(self):
+        url = api_reverse("backend:organismindex")
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # different urls have different etags
+        response = self.client.get(url, {'search': 'chicken'})
+        self.assertNotEqual(response['ETag'], etag)
+
+        # representations with different absolute links too
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=etag,
+            HTTP_X_FORWARDED_HOST="other.example.org")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=etag, HTTP_X_FORWARDED_PROTO="https")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # a write bumps the data version
+        Organism.objects.update(supplied_breed="Chicken")
+        self.fire_deferred_triggers()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_response_cache(self):
+        url = api_reverse("backend:organismindex")
+
+        # only anonymous requests are cached
+        response = self.client.get(url)
+        self.assertNotIn('X-Cache', response)
+
+        self.client.logout()
+
+        response = self.client.get(url, {'search': 'chicken', 'page': 1})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        content = response.content
+
+        # query parameters are normalized
+        response = self.client.get(url, {'page': 1, 'search': 'chicken'})
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.content, content)
+
+        # a write bumps the data version
+        Organism.objects.update(supplied_breed="Chicken")
+        self.fire_deferred_triggers()
+
+        response = self.client.get(url, {'search': 'chicken', 'page': 1})
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+        response = self.client.get(api_reverse("backend:cache_stats"))
+        self.assertGreaterEqual(response.data['hits'], 1)
+        self.assertGreaterEqual(response.data['misses'], 2)
+
+    def test_response_cache_host(self):
+        url = api_reverse("backend:organismindex")
+        self.client.logout()
+
+        # absolute links depend on the forwarded host and scheme
+        for host, proto in [
+                ("first.example.org", "http"),
+                ("second.example.org", "https"),
+                ("first.example.org", "https")]:
+            response = self.client.get(
+                url, HTTP_X_FORWARDED_HOST=host, HTTP_X_FORWARDED_PROTO=proto)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response['X-Cache'], 'MISS')
+
+            data = json.loads(response.content)
+            self.assertTrue(data['results'][0]['url'].startswith(
+                f"{proto}://{host}/"))
+
+    def test_compression(self):
+        url = api_reverse("backend:organismindex")
+
+        self.client.logout()
+
+        response = self.client.get(url)
+        content = response.content
+        self.assertNotIn('Content-Encoding', response)
+
+        # the first response is cached with a compressed copy
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertEqual(gzip.decompress(response.content), content)
+
+        compressed = response.content
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.content, compressed)
+
+        # streaming responses
+        response = self.client.get(
+            api_reverse("backend:organism_download"),
+            HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(
+            b"SAMEA7044752",
+            gzip.decompress(b"".join(response.streaming_content)))
+
+    def test_search_organism(self):
+        url = api_reverse("backend:organismindex")
+
+        # search is case insensitive and match word prefixes
+        response = self.client.get(url, {'search': 'GALL chick'})
+        results = response.data["results"]
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['data_source_id'], "SAMEA7044752")
+        self.assertNotIn('search_vector', results[0])
+
+        response = self.client.get(url, {'search': "chicken 'bos"})
+        self.assertEqual(len(response.data["results"]), 0)
+
+    def test_breed_lookup(self):
+        url = api_reverse("backend:organismindex")
+
+        response = self.client.get(url, {'supplied_breed__iexact': 'Chicken'})
+        self.assertEqual(len(response.data["results"]), 1)
+
+        response = self.client.get(url, {'supplied_breed__iexact': 'chick'})
+        self.assertEqual(len(response.data["results"]), 0)
+
+        response = self.client.get(url, {'supplied_breed__similar': 'chiken'})
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_cursor_pagination(self):
+        url = api_reverse("backend:organismindex")
+        response = self.client.get(url, {'cursor': ''})
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNone(response.data["next"])
+        self.assertNotIn("count", response.data)
+
+        # count objects only if requested
+        response = self.client.get(url, {'cursor': '', 'count': 'true'})
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["total_pages"], 1)
+
+    def test_filtered_summary(self):
+        url = api_reverse("backend:organism_summary")
+        response = self.client.get(url, {'species': 'Gallus gallus'})
+        reference = {
+            'species': {'Gallus gallus': 1},
+            'breed': {'chicken': 1},
+            'sex': {'female': 1},
+            'country': {'Germany': 1}
+        }
+        self.assertDictEqual(reference, response.data)
+
+        # summary tables are updated when organisms are deleted
+        Organism.objects.all().delete()
+
+        response = self.client.get(url, {'species': 'Gallus gallus'})
+        self.assertDictEqual(response.data['species'], {})
+
     def test_summary(self):
         url = api_reverse("backend:organism_graphical_summary")
         response = self.client.get(url)
@@ -104,6 +560,32 @@ class OrganismTestCase(CommonMixin, APITestCase):
         }
         self.assertDictEqual(reference, test)
 
+    def test_binned_summary(self):
+        url = api_reverse("backend:organism_graphical_summary")
+        response = self.client.get(url, {'precision': 5})
+        self.assertEqual(response.data['coordinates'], [[10.0, 50.0, 1]])
+
+        # zoom need to be an integer
+        response = self.client.get(url, {'zoom': 'foo'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_download(self):
+        url = api_reverse("backend:organism_download")
+        response = self.client.get(url, {'species': 'Gallus gallus'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(
+            content,
+            "Data source ID\tSpecies\tSupplied breed\tSex\n"
+            "SAMEA7044752\tGallus gallus\tchicken\tfemale\n")
+
+        # search and export as ndjson
+        response = self.client.get(
+            url, {'search': 'chicken', 'file_format': 'ndjson'})
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(json.loads(content)['data_source_id'], "SAMEA7044752")
+
 
 class GeoJSONTestCase(CommonMixin, APITestCase):
     def test_get_organism(self):
@@ -138,3 +620,115 @@ class GeoJSONTestCase(CommonMixin, APITestCase):
 
         # asserta a GeoJSON object
         self.assertDictEqual(reference, test)
+
+    def test_spatial_filters(self):
+        url = api_reverse("backend:geoorganism_list")
+
+        response = self.client.get(url, {'bbox': '9,50,11,52'})
+        self.assertEqual(response.data["count"], 1)
+
+        response = self.client.get(url, {'bbox': '11,50,12,52'})
+        self.assertEqual(response.data["count"], 0)
+
+        response = self.client.get(url, {'bbox': '11,50,12'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        polygon = json.dumps({
+            "type": "Polygon",
+            "coordinates": [[[9, 50], [11, 50], [11, 52], [9, 52], [9, 50]]]
+        })
+        response = self.client.get(url, {'within': polygon})
+        self.assertEqual(response.data["count"], 1)
+
+        response = self.client.get(url, {'within': 'foo'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # radius in km
+        response = self.client.get(url, {'lat': 51, 'lng': 11, 'rad': 80})
+        self.assertEqual(response.data["count"], 1)
+        self.assertAlmostEqual(
+            float(response.data['features'][0]['properties']['distance']),
+            70.0, delta=1)
+
+        response = self.client.get(url, {'lat': 51, 'lng': 11, 'rad': 60})
+        self.assertEqual(response.data["count"], 0)
+
+    def test_representation_plan(self):
+        queryset = Organism.objects.filter(geom__isnull=False)
+        self.assertSameRepresentation(GeoOrganismSerializer, queryset)
+
+        queryset = queryset.annotate(
+            distance=Distance('geom', Point(11, 51, srid=4326), spheroid=True))
+        self.assertSameRepresentation(GeoOrganismSerializer, queryset)
+
+    def test_nearest_neighbours(self):
+        url = api_reverse("backend:geoorganism_list")
+
+        response = self.client.get(url, {'lat': 51, 'lng': 11, 'k': 1})
+        self.assertEqual(response.data["count"], 1)
+        self.assertAlmostEqual(
+            float(response.data['features'][0]['properties']['distance']),
+            70.0, delta=1)
+
+        response = self.client.get(url, {'lat': 51, 'lng': 11, 'k': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # retrieve an object with the same parameters
+        url = api_reverse(
+            "backend:geoorganism_detail",
+            kwargs={'data_source_id': 'SAMEA7044752'})
+        response = self.client.get(url, {'lat': 51, 'lng': 11, 'k': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cluster(self):
+        url = api_reverse("backend:geoorganism_list")
+
+        response = self.client.get(url, {'cluster': 3, 'bbox': '0,40,20,60'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            "type": "FeatureCollection",
+            "features": [{
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [10.0, 51.0]
+                },
+                "properties": {
+                    "count": 1,
+                    "species": "Gallus gallus"
+                }
+            }]
+        })
+
+        response = self.client.get(url, {'cluster': 3, 'bbox': '0,0,5,5'})
+        self.assertEqual(response.data["features"], [])
+
+        response = self.client.get(url, {'cluster': 'foo'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_tile(self):
+        url = api_reverse(
+            "backend:organism_tile", kwargs={'z': 1, 'x': 1, 'y': 0})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response['Content-Type'], 'application/vnd.mapbox-vector-tile')
+        self.assertIn(b"SAMEA7044752", response.content)
+
+        # clients could accept only tiles
+        response = self.client.get(
+            url, HTTP_ACCEPT='application/vnd.mapbox-vector-tile')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # an empty tile
+        url = api_reverse(
+            "backend:organism_tile", kwargs={'z': 1, 'x': 0, 'y': 1})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, b"")
+
+        # a tile which doesn't exist
+        url = api_reverse(
+            "backend:organism_tile", kwargs={'z': 1, 'x': 2, 'y': 0})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
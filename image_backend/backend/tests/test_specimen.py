@@ -62,6 +62,47 @@ class SpecimenTestCase(CommonMixin, APITestCase):
         response = self.client.put(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_bulk_write(self):
+        url = api_reverse("backend:specimen_bulk")
+
+        with open(os.path.join(BASE_DIR, "data/SAMEA7044739.json")) as handle:
+            data = json.load(handle)
+
+        # update a record and create a new one
+        data["organism_part"] = "Updated part"
+        data["etag"] = '"updated etag"'
+
+        new = dict(data, data_source_id="SAMEA0000001")
+
+        # an invalid record followed by a valid copy (which is written)
+        invalid = dict(data, data_source_id="SAMEA0000002")
+        invalid.pop("species")
+        fixed = dict(data, data_source_id="SAMEA0000002")
+
+        response = self.client.post(
+            url, [data, new, invalid, fixed, new], format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["updated"], 1)
+        self.assertEqual(response.data["error"], 2)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["updated", "created", "error", "created", "error"])
+        self.assertIn(
+            "data_source_id", response.data["results"][4]["errors"])
+
+        self.assertEqual(
+            Specimen.objects.get(pk="SAMEA7044739").organism_part,
+            "Updated part")
+        self.assertTrue(Specimen.objects.filter(pk="SAMEA0000002").exists())
+
+        # geom is computed by database
+        self.assertIsNotNone(Specimen.objects.get(pk="SAMEA0000001").geom)
+
+        # unchanged records are not written
+        response = self.client.post(url, [new], format="json")
+        self.assertEqual(response.data["unchanged"], 1)
+
     def test_get_specimen(self):
         url = api_reverse("backend:specimenindex")
         response = self.client.get(url)
@@ -69,6 +110,15 @@ class SpecimenTestCase(CommonMixin, APITestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]['data_source_id'], "SAMEA7044739")
 
+    def test_filtered_summary(self):
+        url = api_reverse("backend:specimen_summary")
+        response = self.client.get(url, {'organism_part': 'blood'})
+        reference = {
+            'species': {'Gallus gallus': 1},
+            'organism_part': {'blood': 1}
+        }
+        self.assertDictEqual(reference, response.data)
+
     def test_summary(self):
         url = api_reverse("backend:specimens_graphical_summary")
         response = self.client.get(url)
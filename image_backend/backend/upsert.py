@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:31:47 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+
+Create or update organisms or specimens with INSERT ... ON CONFLICT
+(data_source_id) DO UPDATE statements, which write many records at once.
+geom and numeric coordinates are computed by a database trigger (see
+migration 0026). Records with the same etag of the stored ones are read and
+skipped without any write statement (write statements mark tables as
+modified, see migration 0028). DADIS links are resolved with the lookup
+cache (see :py:mod:`backend.lookups`) only for records which are written
+"""
+
+from django.db import connection
+
+from .lookups import get_species, get_or_create_link
+
+# the status of an upserted record
+CREATED, UPDATED, UNCHANGED = 'created', 'updated', 'unchanged'
+
+# columns maintained by database triggers (see migrations)
+COMPUTED_FIELDS = ('geom', 'latitude', 'longitude', 'search_vector')
+
+ETAGS_SQL = "SELECT {pk}, {etag} FROM {table} WHERE {pk} = ANY(%s)"
+
+# xmax is 0 for inserted rows. Rows with the same etag are not returned
+UPSERT_SQL = """
+INSERT INTO {table} ({columns})
+VALUES {values}
+    ON CONFLICT ({pk}) DO {action}
+RETURNING {pk}, (xmax = 0) AS created
+"""
+
+
+def get_etags(model, accessions):
+    """
+    Read the stored etags of many records with a single query
+
+    Parameters
+    ----------
+    model : django.db.models.Model
+        The Organism or the Specimen class.
+    accessions : list
+        The primary keys of records.
+
+    Returns
+    -------
+    dict
+        The etag of each stored record.
+    """
+
+    quote_name = connection.ops.quote_name
+    opts = model._meta
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            ETAGS_SQL.format(
+                pk=quote_name(opts.pk.column),
+                etag=quote_name(opts.get_field('etag').column),
+                table=quote_name(opts.db_table)),
+            [list(accessions)])
+
+        return dict(cursor.fetchall())
+
+
+def get_row(model, validated_data):
+    """
+    Convert validated data into the values of an upsert statement. The
+    DADIS link is resolved (or created) if provided
+
+    Parameters
+    ----------
+    model : django.db.models.Model
+        The Organism or the Specimen class.
+    validated_data : dict
+        The validated data of a serializer (with 'dadis' for organisms).
+
+    Raises
+    ------
+    backend.models.Species2CommonName.DoesNotExist
+        If the species of the DADIS link is unknown.
+
+    Returns
+    -------
+    columns : tuple
+        The columns to be inserted.
+    params : list
+        The values of columns.
+    updates : tuple
+        The columns updated for existing records (the submitted fields
+        only, the DADIS link is kept if not provided).
+    """
+
+    validated_data = dict(validated_data)
+    dadis_data = validated_data.pop('dadis', None)
+
+    # an instance with the default values of the missing fields
+    instance = model(**validated_data)
+
+    columns, params, updates = [], [], []
+
+    for field in model._meta.concrete_fields:
+        if field.name in COMPUTED_FIELDS or field.name == 'dadis':
+            continue
+
+        columns.append(field.column)
+        params.append(field.get_db_prep_save(
+            getattr(instance, field.attname), connection))
+
+        if field.name in validated_data and not field.primary_key:
+            updates.append(field.column)
+
+    if dadis_data:
+        dadis_data = dict(dadis_data)
+        species = get_species(**dadis_data.pop('species'))
+        link, _ = get_or_create_link(species, **dadis_data)
+
+        column = model._meta.get_field('dadis').column
+        columns.append(column)
+        params.append(link.pk)
+        updates.append(column)
+
+    return tuple(columns), params, tuple(updates)
+
+
+def upsert_rows(model, columns, updates, rows):
+    """
+    Create or update many records with a single statement. Existing records
+    are updated only if etag differs
+
+    Parameters
+    ----------
+    model : django.db.models.Model
+        The Organism or the Specimen class.
+    columns : tuple
+        The columns to be inserted (see :py:func:`get_row`).
+    updates : tuple
+        The columns updated for existing records.
+    rows : list
+        The values of each record (with distinct primary keys).
+
+    Returns
+    -------
+    dict
+        'created' or 'updated' for each written record.
+    """
+
+    quote_name = connection.ops.quote_name
+
+    opts = model._meta
+    table = quote_name(opts.db_table)
+    etag = quote_name(opts.get_field('etag').column)
+
+    if updates:
+        assignments = ", ".join(
+            f"{quote_name(column)} = EXCLUDED.{quote_name(column)}"
+            for column in updates)
+        action = (
+            f"UPDATE SET {assignments} "
+            f"WHERE {table}.{etag} IS DISTINCT FROM EXCLUDED.{etag}")
+
+    else:
+        action = "NOTHING"
+
+    placeholders = "({})".format(", ".join(["%s"] * len(columns)))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            UPSERT_SQL.format(
+                table=table,
+                columns=", ".join(quote_name(column) for column in columns),
+                values=", ".join([placeholders] * len(rows)),
+                pk=quote_name(opts.pk.column),
+                action=action),
+            [value for row in rows for value in row])
+
+        return {
+            accession: CREATED if created else UPDATED
+            for accession, created in cursor.fetchall()}
+
+
+def upsert(model, validated_data):
+    """
+    Create or update a single record. Existing records are updated only if
+    etag differs
+
+    Parameters
+    ----------
+    model : django.db.models.Model
+        The Organism or the Specimen class.
+    validated_data : dict
+        The validated data of a serializer (with 'dadis' for organisms).
+
+    Raises
+    ------
+    backend.models.Species2CommonName.DoesNotExist
+        If the species of the DADIS link is unknown.
+
+    Returns
+    -------
+    str
+        'created', 'updated' or 'unchanged'.
+    """
+
+    accession = validated_data[model._meta.pk.name]
+    stored = get_etags(model, [accession])
+
+    if accession in stored and stored[accession] == validated_data['etag']:
+        return UNCHANGED
+
+    columns, params, updates = get_row(model, validated_data)
+    statuses = upsert_rows(model, columns, updates, [params])
+
+    return statuses.get(accession, UNCHANGED)
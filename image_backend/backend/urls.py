@@ -61,8 +61,13 @@ urlpatterns = [
          geoorganism_detail,
          name='geoorganism_detail'),
 
-    path('organism/download/', views.download_organism_data,
+    path('organism.mvt/<int:z>/<int:x>/<int:y>', views.get_material_tile,
+         {'material': 'organism'}, name='organism_tile'),
+
+    path('organism/download/', views.OrganismDownloadView.as_view(),
          name='organism_download'),
+    path('organism/bulk/', views.OrganismBulkView.as_view(),
+         name='organism_bulk'),
     path('organism/<data_source_id>/', views.OrganismsDetailsView.as_view(),
          name='organismdetail'),
     path('specimen/', views.ListSpecimensView.as_view(),
@@ -79,17 +84,27 @@ urlpatterns = [
          geospecimen_detail,
          name='geospecimen_detail'),
 
-    path('specimen/download/', views.download_specimen_data,
+    path('specimen.mvt/<int:z>/<int:x>/<int:y>', views.get_material_tile,
+         {'material': 'specimen'}, name='specimen_tile'),
+
+    path('specimen/download/', views.SpecimenDownloadView.as_view(),
          name='specimen_download'),
+    path('specimen/bulk/', views.SpecimenBulkView.as_view(),
+         name='specimen_bulk'),
     path('specimen/<data_source_id>/', views.SpecimensDetailsView.as_view(),
          name='specimendetail'),
     path('file/', views.ListCreateFilesView.as_view(), name='fileindex'),
-    path('file/download/', views.download_file_data, name='file_download'),
+    path('file/download/', views.FilesDownloadView.as_view(),
+         name='file_download'),
     path('file/<specimen_id>/', views.FilesDetailsView.as_view(),
          name='filedetail'),
     path('species/', species2commonnames_list, name='species'),
     path('dadis_link/', dadislink_list, name='dadis_link'),
     path('dadis_link/<int:pk>/', dadislink_detail, name='dadis_link-detail'),
+    path('cache/', views.cache_stats, name='cache_stats'),
     path('etag/', etag_list, name='etag-list'),
+    path('etag/diff/', views.etag_diff, name='etag-diff'),
+    path('etag/snapshot/', views.EtagSnapshotView.as_view(),
+         name='etag-snapshot'),
     path('etag/<str:data_source_id>/', etag_detail, name='etag-detail'),
 ]
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:42:36 2026
+
+@author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
+
+Validate and cache responses with the data version of the tables they are
+built from
+"""
+
+import hashlib
+import functools
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
+from django.views.decorators.http import condition
+
+from .compression import precompress
+from .models import DataVersion
+
+# prefix for response cache keys and counters
+CACHE_PREFIX = 'response'
+
+# cache hits and misses of this worker process
+CACHE_EVENTS = {'hits': 0, 'misses': 0}
+
+# response headers stored in cache with content
+CACHED_HEADERS = ('Content-Type', 'Vary', 'Allow')
+
+
+def get_data_versions(request):
+    """
+    Read all the data versions with a single query. Versions are cached in
+    the request object (used by both etag and last_modified functions)
+
+    Parameters
+    ----------
+    request : django.http.HttpRequest
+        The current request.
+
+    Returns
+    -------
+    versions : dict
+        A dictionary of (version, last_modified) tuples for each table.
+    """
+
+    if not hasattr(request, '_data_versions'):
+        request._data_versions = {
+            table_name: (version, last_modified)
+            for table_name, version, last_modified in
+            DataVersion.objects.values_list(
+                'table_name', 'version', 'last_modified')
+        }
+
+    return request._data_versions
+
+
+def get_data_token(request, tables):
+    """
+    Describe the data versions of tables with a string
+
+    Parameters
+    ----------
+    request : django.http.HttpRequest
+        The current request.
+    tables : tuple
+        The tables used to build the response.
+
+    Returns
+    -------
+    str
+        A string like 'table:version:last_modified|...' or None if
+        versions are unknown.
+    """
+
+    versions = get_data_versions(request)
+
+    if not all(table in versions for table in tables):
+        return None
+
+    return "|".join(
+        "{table}:{version}:{last_modified}".format(
+            table=table,
+            version=versions[table][0],
+            last_modified=versions[table][1].isoformat())
+        for table in tables)
+
+
+def get_data_key(request, tables):
+    """
+    Identify a response by the normalized url (query parameters are
+    sorted), the scheme and the host (responses contain absolute links,
+    which depend on proxy headers), the accepted media types (different
+    representations need different keys) and the data versions of tables
+
+    Parameters
+    ----------
+    request : django.http.HttpRequest
+        The current request.
+    tables : tuple
+        The tables used to build the response.
+
+    Returns
+    -------
+    str
+        A md5 digest or None if versions are unknown.
+    """
+
+    token = get_data_token(request, tables)
+
+    if token is None:
+        return None
+
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+
+    key = "|".join([
+        request.scheme,
+        request.get_host(),
+        request.path,
+        query,
+        request.META.get('HTTP_ACCEPT', ''),
+        token])
+
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def get_data_last_modified(request, tables):
+    """Return the most recent modification time of tables (or None)"""
+
+    versions = get_data_versions(request)
+
+    if not all(table in versions for table in tables):
+        return None
+
+    return max(versions[table][1] for table in tables)
+
+
+def is_cacheable(request):
+    """Only anonymous GET requests are served from cache"""
+
+    if request.method not in ('GET', 'HEAD'):
+        return False
+
+    if 'HTTP_AUTHORIZATION' in request.META:
+        return False
+
+    user = getattr(request, 'user', None)
+
+    return user is None or not user.is_authenticated
+
+
+def count_cache_event(event):
+    """Increment the 'hits' or 'misses' counter. Counters are kept by each
+    worker process: the hit path never writes to the shared cache"""
+
+    CACHE_EVENTS[event] += 1
+
+
+def get_cache_stats():
+    """Return the response cache counters of this worker"""
+
+    hits = CACHE_EVENTS['hits']
+    misses = CACHE_EVENTS['misses']
+    total = hits + misses
+
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 3) if total else None
+    }
+
+
+def cache_response(*tables):
+    """
+    A view decorator which stores responses to anonymous GET requests in
+    the shared cache. Keys depend on data versions, so entries of older
+    versions are never read again (they expire or are culled). Compressed
+    copies of content are stored too (see
+    :py:func:`backend.compression.precompress`)
+
+    Parameters
+    ----------
+    *tables : str
+        The tables used to build the response.
+
+    Returns
+    -------
+    function
+        A django view decorator.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not is_cacheable(request):
+                return view(request, *args, **kwargs)
+
+            data_key = get_data_key(request, tables)
+
+            if data_key is None:
+                return view(request, *args, **kwargs)
+
+            key = f"{CACHE_PREFIX}:{data_key}"
+            cached = cache.get(key)
+
+            if cached is not None:
+                count_cache_event('hits')
+                content, headers = cached
+
+                response = HttpResponse(content)
+
+                for header, value in headers.items():
+                    response[header] = value
+
+                response['X-Cache'] = 'HIT'
+
+                # compressed copies are stored with the same key
+                precompress(request, response, key)
+
+                return response
+
+            count_cache_event('misses')
+            response = view(request, *args, **kwargs)
+
+            # render django-rest-framework responses before storing them
+            if hasattr(response, 'render'):
+                response.render()
+
+            # html pages (browsable API) contain CSRF tokens
+            if (response.status_code == 200 and not response.streaming and
+                    not response.get('Content-Type', '').startswith(
+                        'text/html')):
+                headers = {
+                    header: response[header] for header in CACHED_HEADERS
+                    if response.has_header(header)}
+
+                cache.set(key, (response.content, headers))
+                precompress(request, response, key)
+
+            response['X-Cache'] = 'MISS'
+
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def conditional(*tables):
+    """
+    A view decorator which sets ETag and Last-Modified headers and returns
+    304 responses (before executing the view) if data are not changed.
+    ETags depend on scheme and host too (see :py:func:`get_data_key`).
+    Other responses are served from the shared cache when possible
+
+    Parameters
+    ----------
+    *tables : str
+        The tables used to build the response.
+
+    Returns
+    -------
+    function
+        A django view decorator.
+    """
+
+    def decorator(view):
+        return condition(
+            etag_func=lambda request, *args, **kwargs: get_data_key(
+                request, tables),
+            last_modified_func=lambda request, *args, **kwargs: (
+                get_data_last_modified(request, tables))
+        )(cache_response(*tables)(view))
+
+    return decorator
+
+
+def conditional_view(*tables):
+    """Apply :py:func:`conditional` to a class based view"""
+
+    return method_decorator(conditional(*tables), name='dispatch')
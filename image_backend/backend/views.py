@@ -1,21 +1,41 @@
+import math
 
-from django.http import HttpResponse
-from django.db.models import Count
-from django.contrib.gis.geos import GEOSGeometry
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import Sum
 from django.contrib.gis.db.models.functions import Distance
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_safe
 
 from rest_framework import generics, permissions, filters
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 from rest_framework.views import status
 from rest_framework import viewsets
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 from rest_framework_gis.pagination import GeoJsonPagination
 from django_filters.rest_framework import DjangoFilterBackend
 
 from .models import (
-    Specimen, Organism, Files, Species2CommonName, DADISLink, Etag)
+    Specimen, Organism, Files, Species2CommonName, DADISLink, Etag,
+    OrganismSummary, SpecimenSummary)
+from .exports import (
+    get_export_options, stream_export, unnest_files, iter_manifest,
+    EXPORT_FORMATS, FILES_EXPORT_FORMATS, CURSOR_CHUNK_SIZE)
+from .bulk import get_bulk_records, get_bulk_serializer, write_records
+from .etags import get_etag_diff_options, diff_etags
+from .filters import FullTextSearchFilter, OrganismFilter, SpecimenFilter
+from .representation import get_plan
+from .geo import (
+    get_grid_size, count_grid_cells, get_tile, get_bbox, get_within,
+    get_point, get_knn_limit, dwithin_geography, cluster_points,
+    check_tile, GeographyKNN, MVT_CONTENT_TYPE)
+from .versions import (
+    conditional, conditional_view, get_cache_stats, get_data_token)
 from .serializers import (
     SpecimenSerializer, OrganismSerializer, OrganismSerializerShort,
     SpecimenSerializerShort, FilesSerializer, Species2CommonNameSerializer,
@@ -70,6 +90,7 @@ def backend_root(request, format=None):
     return Response(construct_reponse(data))
 
 
+@conditional('backend_organism')
 @api_view(['GET'])
 def get_organisms_summary(request, format=None):
     # get filters from get request
@@ -78,8 +99,9 @@ def get_organisms_summary(request, format=None):
     sex_filter = request.GET.get('sex', False)
     country_filter = request.GET.get('efabis_breed_country', False)
 
-    # gett all my organisms (amimal) in a queryset
-    results = Organism.objects.all()
+    # read counts from the pre-aggregated table (species x breed x sex x
+    # country) instead of scanning all my organisms
+    results = OrganismSummary.objects.all()
 
     # update queryset with filter submitted by GET
     if species_filter:
@@ -97,14 +119,14 @@ def get_organisms_summary(request, format=None):
 
     def count_items(field, results=results):
         qs = results.values(field).annotate(
-            total=Count(field)).order_by('total')
+            count=Sum('total')).order_by('count')
 
         count = dict()
 
         # update species result
         for item in qs:
             key = item[field]
-            total = item['total']
+            total = item['count']
             count[key] = total
 
         return count
@@ -123,70 +145,102 @@ def get_organisms_summary(request, format=None):
     })
 
 
+@conditional('backend_organism')
 @api_view(['GET'])
 def get_organisms_graphical_summary(request, format=None):
-    """Return statistics for IMAGE-Portal summary page"""
-
-    # start queryset
-    results = Organism.objects.all()
-
-    def count_items(field, results=results):
-        qs = results.values(field).annotate(
-            total=Count(field)).order_by('total')
-
-        count = dict()
-
-        # update species result
-        for item in qs:
-            key = item[field]
-            total = item['total']
-            count[key] = total
+    """Return statistics for IMAGE-Portal summary page. Coordinates could
+    be snapped to a grid by providing a 'precision' (in degrees) or a 'zoom'
+    level: in such case unique cells are returned as (lng, lat, count)"""
+
+    species_count = dict()
+    breeds_count = dict()
+    country_count = dict()
+
+    # count countries, species and breeds in the same query relying on
+    # pre-aggregated table. GROUPING() returns a bitmask for columns which
+    # are not part of the current grouping set
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT species,
+                   supplied_breed,
+                   efabis_breed_country,
+                   GROUPING(species, supplied_breed, efabis_breed_country),
+                   SUM(total) AS count
+              FROM backend_organismsummary
+          GROUP BY GROUPING SETS (
+                   (efabis_breed_country),
+                   (species),
+                   (species, supplied_breed))
+          ORDER BY count""")
+
+        breeds = list()
+
+        for species, breed, country, grouping, total in cursor.fetchall():
+            if grouping == 6:
+                country_count[country] = total
+
+            elif grouping == 3:
+                species_count[species] = total
+
+            else:
+                breeds.append((species, breed, total))
+
+    # breeds are sorted by descending total
+    for species, breed, total in reversed(breeds):
+        breeds_count.setdefault(species, dict())[breed] = total
+
+    grid_size = get_grid_size(request.query_params)
+
+    if grid_size:
+        coordinates = count_grid_cells(Organism.objects.all(), grid_size)
+
+    else:
+        # select valid coordinates using the numeric columns, return the
+        # submitted values
+        coordinates = list(
+            Organism.objects.filter(
+                longitude__isnull=False,
+                latitude__isnull=False).values_list(
+                    'birth_location_longitude',
+                    'birth_location_latitude').order_by())
 
-        return count
-
-    def count_breeds(results=results):
-        qs = results.values(
-            'species',
-            'supplied_breed').annotate(
-                total=Count('species')).order_by('-total')
+    return Response({
+        'species': species_count,
+        'breeds': breeds_count,
+        'countries': country_count,
+        'coordinates': coordinates
+    })
 
-        count = dict()
 
-        # read count items
-        for item in qs:
-            species = item['species']
-            breed = item['supplied_breed']
-            total = item['total']
+class FastListMixin():
+    """Build list responses from values() rows with a precompiled
+    representation of the serializer (see
+    :py:mod:`backend.representation`). Serializers which can't be
+    represented in this way are used as usual"""
 
-            if species not in count:
-                count.setdefault(species, dict())
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
 
-            count[species][breed] = total
+        plan = get_plan(serializer, queryset)
 
-        return count
+        if plan is not None:
+            queryset = queryset.values(*plan.columns)
 
-    country_count = count_items('efabis_breed_country')
-    species_count = count_items('species')
-    breeds_count = count_breeds()
+        page = self.paginate_queryset(queryset)
 
-    coordinates = list()
+        if page is not None:
+            data = (
+                plan.to_representation_many(page) if plan else
+                self.get_serializer(page, many=True).data)
 
-    organisms = results.exclude(
-        birth_location_longitude='',
-        birth_location_latitude='')
+            return self.get_paginated_response(data)
 
-    for organism in organisms:
-        coordinates.append(
-            (organism.birth_location_longitude,
-             organism.birth_location_latitude)
-        )
+        data = (
+            plan.to_representation_many(queryset) if plan else
+            self.get_serializer(queryset, many=True).data)
 
-    return Response({
-        'species': species_count,
-        'breeds': breeds_count,
-        'countries': country_count,
-        'coordinates': coordinates
-    })
+        return Response(data)
 
 
 class CustomGeoJsonPagination(GeoJsonPagination):
@@ -197,7 +251,10 @@ class GeoMaterialMixin():
     def get_queryset(self):
         """
         Ovverride queryset: read location from GET request and annotate by
-        distance
+        distance. Objects could be filtered by a bounding box ('bbox'), by
+        a polygon ('within') or by a radius in km ('rad') from a point
+        ('lat', 'lng'). Without a radius, objects are the nearest
+        neighbours of the point (limited to 'k' objects if provided)
 
         Returns
         -------
@@ -207,58 +264,74 @@ class GeoMaterialMixin():
         qs = super().get_queryset()
 
         # read params from query
-        lat = self.request.query_params.get('lat', None)
-        lng = self.request.query_params.get('lng', None)
-        rad = self.request.query_params.get('rad', None)
+        bbox = get_bbox(self.request.query_params)
+        within = get_within(self.request.query_params)
+        pnt, radius = get_point(self.request.query_params)
+
+        if bbox:
+            qs = qs.filter(geom__bboverlaps=bbox)
+
+        if within:
+            qs = qs.filter(geom__within=within)
+
+        if pnt:
+            # distances are computed only for the selected objects
+            qs = qs.annotate(distance=Distance('geom', pnt, spheroid=True))
+
+            if radius:
+                # select candidates with the geography index
+                qs = qs.annotate(
+                    in_radius=dwithin_geography('geom', pnt, radius)
+                ).filter(in_radius=True).order_by("distance")
 
-        if lat and lng:
-            pnt = GEOSGeometry(f'POINT({lng} {lat})', srid=4326)
-            qs = qs.annotate(
-                distance=Distance('geom', pnt, spheroid=True)
-            ).order_by("distance")
+            else:
+                # a nearest neighbour search which reads objects in order
+                # from the geography index
+                qs = qs.order_by(GeographyKNN('geom', pnt).asc())
 
-            if rad:
-                # express radius in km
-                qs = qs.filter(distance__lte=float(rad)*1000)
+                k = get_knn_limit(self.request.query_params)
+
+                # limit only lists of features (objects are retrieved by
+                # filtering this queryset, clusters need to be sorted)
+                if (k and self.action == 'list' and
+                        not self.request.query_params.get('cluster')):
+                    qs = qs[:k]
 
         return qs
 
+    def list(self, request, *args, **kwargs):
+        """Return clusters instead of features if 'cluster' (a zoom level)
+        is provided"""
+
+        zoom = request.query_params.get('cluster', None)
+
+        if zoom:
+            queryset = self.filter_queryset(self.get_queryset())
+            return Response(
+                cluster_points(queryset, zoom, self.cluster_field))
+
+        return super().list(request, *args, **kwargs)
+
 
-class GeoOrganismViewSet(GeoMaterialMixin, viewsets.ReadOnlyModelViewSet):
+@conditional_view('backend_organism')
+class GeoOrganismViewSet(
+        GeoMaterialMixin, FastListMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Organism.objects.filter(geom__isnull=False)
     lookup_field = "data_source_id"
     serializer_class = GeoOrganismSerializer
     pagination_class = CustomGeoJsonPagination
+    cluster_field = 'species'
 
 
-def download_organism_data(request):
-    data_to_download = 'Data source ID\tSpecies\tSupplied breed\tSex\n'
-    species_filter = request.GET.get('species', False)
-    breed_filter = request.GET.get('supplied_breed', False)
-    sex_filter = request.GET.get('sex', False)
-    results = Organism.objects.all()
-    if species_filter:
-        results = results.filter(species=species_filter)
-    if breed_filter:
-        results = results.filter(supplied_breed=breed_filter)
-    if sex_filter:
-        results = results.filter(sex=sex_filter)
-    for record in results:
-        data_to_download += f'{record.data_source_id}\t{record.species}\t' \
-                            f'{record.supplied_breed}\t{record.sex}\n'
-    response = HttpResponse(data_to_download, content_type='text/plain')
-    response['Content-Disposition'] = 'attachment; filename="IMAGE_organisms' \
-                                      '.txt"'
-    return response
-
-
+@conditional('backend_specimen')
 @api_view(['GET'])
 def get_specimens_summary(request, format=None):
     # get filters from get request
     species_filter = request.GET.get('species', False)
     organism_part_filter = request.GET.get('organism_part', False)
 
-    results = Specimen.objects.all()
+    # read counts from the pre-aggregated table (species x organism_part)
+    results = SpecimenSummary.objects.all()
 
     # update queryset with filter submitted by GET
     if species_filter:
@@ -269,14 +342,14 @@ def get_specimens_summary(request, format=None):
 
     def count_items(field, results=results):
         qs = results.values(field).annotate(
-            total=Count(field)).order_by('total')
+            count=Sum('total')).order_by('count')
 
         count = dict()
 
         # update species result
         for item in qs:
             key = item[field]
-            total = item['total']
+            total = item['count']
             count[key] = total
 
         return count
@@ -290,40 +363,35 @@ def get_specimens_summary(request, format=None):
     })
 
 
+@conditional('backend_specimen')
 @api_view(['GET'])
 def get_specimens_graphical_summary(request, format=None):
-    """Return statistics for IMAGE-Portal summary page"""
+    """Return statistics for IMAGE-Portal summary page. Coordinates could
+    be snapped to a grid by providing a 'precision' (in degrees) or a 'zoom'
+    level: in such case unique cells are returned as (lng, lat, count)"""
 
-    # start queryset
-    results = Specimen.objects.all()
+    qs = SpecimenSummary.objects.values('organism_part').annotate(
+        count=Sum('total')).order_by('count')
 
-    def count_items(field, results=results):
-        qs = results.values(field).annotate(
-            total=Count(field)).order_by('total')
+    organism_count = dict()
 
-        count = dict()
+    for item in qs:
+        organism_count[item['organism_part']] = item['count']
 
-        # update species result
-        for item in qs:
-            key = item[field]
-            total = item['total']
-            count[key] = total
-
-        return count
-
-    organism_count = count_items('organism_part')
-
-    coordinates = list()
+    grid_size = get_grid_size(request.query_params)
 
-    specimens = results.exclude(
-        collection_place_latitude='',
-        collection_place_longitude='')
+    if grid_size:
+        coordinates = count_grid_cells(Specimen.objects.all(), grid_size)
 
-    for specimen in specimens:
-        coordinates.append(
-            (specimen.collection_place_longitude,
-             specimen.collection_place_latitude)
-        )
+    else:
+        # select valid coordinates using the numeric columns, return the
+        # submitted values
+        coordinates = list(
+            Specimen.objects.filter(
+                longitude__isnull=False,
+                latitude__isnull=False).values_list(
+                    'collection_place_longitude',
+                    'collection_place_latitude').order_by())
 
     return Response({
         'organism_part': organism_count,
@@ -331,38 +399,122 @@ def get_specimens_graphical_summary(request, format=None):
     })
 
 
-class GeoSpecimenViewSet(GeoMaterialMixin, viewsets.ReadOnlyModelViewSet):
+@conditional_view('backend_specimen')
+class GeoSpecimenViewSet(
+        GeoMaterialMixin, FastListMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Specimen.objects.filter(geom__isnull=False)
     lookup_field = "data_source_id"
     serializer_class = GeoSpecimenSerializer
     pagination_class = CustomGeoJsonPagination
+    cluster_field = 'species'
 
 
-def download_specimen_data(request):
-    data_to_download = 'Data source ID\tSpecies\tDerived from\tOrganism part\n'
-    species_filter = request.GET.get('species', False)
-    organism_part_filter = request.GET.get('organism_part', False)
-    results = Specimen.objects.all()
-    if species_filter:
-        results = results.filter(species=species_filter)
-    if organism_part_filter:
-        results = results.filter(organism_part=organism_part_filter)
-    for record in results:
-        data_to_download += f'{record.data_source_id}\t{record.species}\t' \
-                            f'{record.derived_from}\t' \
-                            f'{record.organism_part}\n'
-    response = HttpResponse(data_to_download, content_type='text/plain')
-    response['Content-Disposition'] = 'attachment; filename="IMAGE_specimens' \
-                                      '.txt"'
-    return response
+# the table, the layer name and the feature properties of vector tiles
+TILE_LAYERS = {
+    'organism': (
+        'backend_organism',
+        'organism',
+        ('data_source_id', 'species', 'supplied_breed')),
+    'specimen': (
+        'backend_specimen',
+        'specimen',
+        ('data_source_id', 'species', 'organism_part')),
+}
+
+
+@require_safe
+def get_material_tile(request, material, z, x, y):
+    """Return organism or specimen locations as a Mapbox Vector Tile.
+    Tiles are cached on disk until data are changed. This is a plain django
+    view: content negotiation of django-rest-framework would reject the
+    requests which accept only the tile media type"""
+
+    table, layer, columns = TILE_LAYERS[material]
+
+    try:
+        check_tile(z, x, y)
+
+    except ValidationError as exc:
+        return JsonResponse(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+
+    # the same tile is returned to all users
+    token = get_data_token(request, (table, ))
+    key = f"{material}:{z}/{x}/{y}:{token}"
+
+    tile_cache = caches['tiles']
+    tile = tile_cache.get(key)
+
+    if tile is None:
+        tile = get_tile(table, layer, columns, z, x, y)
+
+        if token:
+            tile_cache.set(key, tile)
+
+    return HttpResponse(tile, content_type=MVT_CONTENT_TYPE)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginate objects relying on a unique key (data_source_id by default, a
+    view could define a different 'cursor_ordering'): each page is a range
+    scan on the primary key index, no matter how deep is the page. Counting
+    objects is expensive and is done only when '?count=true' is provided
+    """
+
+    ordering = '-data_source_id'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000000
+    count_query_param = 'count'
+
+    def get_ordering(self, request, queryset, view):
+        # ignore the 'ordering' param: a keyset need a unique key
+        return (getattr(view, 'cursor_ordering', self.ordering),)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+
+        count = request.query_params.get(self.count_query_param, '')
+
+        if count.lower() in ('1', 'true', 'yes'):
+            self.count = queryset.count()
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ])
+
+        if self.count is not None:
+            response['count'] = self.count
+            response['total_pages'] = math.ceil(self.count / self.page_size)
+
+        response['results'] = data
+
+        return Response(response)
 
 
 # https://www.django-rest-framework.org/api-guide/pagination/#custom-pagination-styles
 # https://stackoverflow.com/a/40985524
 class CustomPaginationMixin():
-    """Custom Mixin to add the numer of pages in a response"""
+    """Custom Mixin to add the numer of pages in a response. If a 'cursor'
+    parameter is provided (even empty), switch to keyset pagination"""
+
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination()
+            self.keyset.page_size = self.page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        return super().paginate_queryset(queryset, request, view)
 
     def get_paginated_response(self, data):
+        if self.keyset:
+            return self.keyset.get_paginated_response(data)
+
         return Response({
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
@@ -384,46 +536,113 @@ class LargeResultsSetPagination(CustomPaginationMixin, PageNumberPagination):
     max_page_size = 1000000
 
 
-class ListSpecimensView(generics.ListCreateAPIView):
+class SparseFieldsMixin():
+    """Restrict the SQL projection to the fields selected with 'fields' or
+    'omit' query parameters (see
+    :py:class:`backend.serializers.DynamicFieldsMixin`)"""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+
+        params = self.request.query_params
+
+        if (self.request.method not in ('GET', 'HEAD') or
+                not (params.get('fields') or params.get('omit'))):
+            return queryset
+
+        # fields are already selected by serializer
+        serializer = self.get_serializer()
+
+        # the primary key is required to build urls and to paginate
+        columns = {queryset.model._meta.pk.name}
+
+        for field in serializer.fields.values():
+            if field.source != '*':
+                columns.add(field.source.split(".")[0])
+
+        # related objects can't be deferred and selected at the same time
+        related = queryset.query.select_related
+
+        if isinstance(related, dict) and not related.keys() & columns:
+            queryset = queryset.select_related(None)
+
+        return queryset.only(*columns)
+
+
+class BulkWriteMixin():
+    """Create or update a list of records with a single POST request (see
+    :py:mod:`backend.bulk`). Return the status of each record"""
+
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs):
+        records = get_bulk_records(request.data)
+
+        serializer = get_bulk_serializer(
+            self.get_serializer_class(), self.get_serializer_context())
+
+        results = write_records(serializer, records)
+
+        response = OrderedDict(
+            (status, 0) for status in (
+                'created', 'updated', 'unchanged', 'error'))
+
+        for result in results:
+            response[result['status']] += 1
+
+        response['results'] = results
+
+        return Response(response)
+
+
+class ExportMixin():
+    """Stream the filtered queryset to the client as a file, using a server
+    side cursor: file format could be selected with 'file_format' (tsv, csv
+    or ndjson) and data could be compressed with 'compression=gzip'"""
+
+    pagination_class = None
+
+    # the columns to be exported and their names in file header
+    export_formats = EXPORT_FORMATS
+    export_columns = ()
+    export_header = ()
+    export_filename = None
+
+    def get_export_data(self, queryset, file_format):
+        """Return column names, header and an iterator of rows"""
+
+        rows = queryset.values_list(*self.export_columns).iterator(
+            chunk_size=CURSOR_CHUNK_SIZE)
+
+        return self.export_columns, self.export_header, rows
+
+    def get(self, request, *args, **kwargs):
+        file_format, compression = get_export_options(
+            request.query_params, self.export_formats)
+
+        queryset = self.filter_queryset(self.get_queryset())
+
+        columns, header, rows = self.get_export_data(queryset, file_format)
+
+        return stream_export(
+            rows,
+            columns,
+            header,
+            self.export_filename,
+            file_format,
+            compression,
+            self.export_formats)
+
+
+@conditional_view('backend_specimen')
+class ListSpecimensView(
+        SparseFieldsMixin, FastListMixin, generics.ListCreateAPIView):
     serializer_class = SpecimenSerializer
     pagination_class = SmallResultsSetPagination
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['data_source_id', 'alternative_id', 'project',
-                     'submission_title', 'material', 'material_ontology',
-                     'person_last_name', 'person_email', 'person_affiliation',
-                     'person_role', 'person_role_ontology',
-                     'organization_name',
-                     'organization_role', 'organization_role_ontology',
-                     'gene_bank_name', 'gene_bank_country',
-                     'gene_bank_country_ontology', 'data_source_type',
-                     'data_source_version', 'species', 'species_ontology',
-                     'etag', 'submission_description', 'person_first_name',
-                     'organization_address', 'organization_country',
-                     'organization_country_ontology', 'description',
-                     'person_initial', 'organization_uri', 'publication_doi',
-                     'derived_from',
-                     'collection_place_accuracy',
-                     'organism_part',
-                     'organism_part_ontology',
-                     'specimen_collection_protocol',
-                     'collection_date',
-                     'collection_date_unit',
-                     'collection_place_latitude',
-                     'collection_place_latitude_unit',
-                     'collection_place_longitude',
-                     'collection_place_longitude_unit',
-                     'collection_place',
-                     'developmental_stage',
-                     'developmental_stage_ontology',
-                     'physiological_stage',
-                     'physiological_stage_ontology',
-                     'availability', 'sample_storage',
-                     'sample_storage_processing',
-                     'animal_age_at_collection',
-                     'animal_age_at_collection_unit',
-                     'sampling_to_preparation_interval',
-                     'sampling_to_preparation_interval_unit']
+    # search relying on the search_vector column (its columns and weights
+    # are defined by the trigger of migration 0021)
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
     ordering_fields = ['data_source_id']
 
     def get_queryset(self):
@@ -439,13 +658,14 @@ class ListSpecimensView(generics.ListCreateAPIView):
                         status=status.HTTP_400_BAD_REQUEST)
 
 
+@conditional_view('backend_specimen')
 class ListSpecimensViewShort(generics.ListCreateAPIView):
     serializer_class = SpecimenSerializerShort
     pagination_class = SmallResultsSetPagination
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
     filter_backends = [DjangoFilterBackend, filters.SearchFilter,
                        filters.OrderingFilter]
-    filterset_fields = ['species', 'organism_part']
+    filterset_class = SpecimenFilter
     search_fields = ['species', 'organism_part']
     ordering_fields = ['data_source_id', 'species', 'derived_from',
                        'organism_part']
@@ -462,48 +682,45 @@ class ListSpecimensViewShort(generics.ListCreateAPIView):
                         status=status.HTTP_400_BAD_REQUEST)
 
 
-class SpecimensDetailsView(generics.RetrieveUpdateDestroyAPIView):
+@conditional_view('backend_specimen')
+class SpecimensDetailsView(
+        SparseFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Specimen.objects.all()
     lookup_field = "data_source_id"
     serializer_class = SpecimenSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
 
 
-class ListOrganismsView(generics.ListCreateAPIView):
+class SpecimenBulkView(BulkWriteMixin, generics.GenericAPIView):
+    queryset = Specimen.objects.all()
+    serializer_class = SpecimenSerializer
+
+
+class SpecimenDownloadView(ExportMixin, generics.GenericAPIView):
+    queryset = Specimen.objects.all()
+    permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
+    filter_backends = [DjangoFilterBackend] + ListSpecimensView.filter_backends
+    filterset_class = SpecimenFilter
+    ordering_fields = ListSpecimensView.ordering_fields
+    export_columns = (
+        'data_source_id', 'species', 'derived_from', 'organism_part')
+    export_header = (
+        'Data source ID', 'Species', 'Derived from', 'Organism part')
+    export_filename = "IMAGE_specimens"
+
+
+@conditional_view(
+    'backend_organism', 'backend_dadislink', 'backend_species2commonname')
+class ListOrganismsView(
+        SparseFieldsMixin, FastListMixin, generics.ListCreateAPIView):
     serializer_class = OrganismSerializer
     pagination_class = SmallResultsSetPagination
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
+    # search relying on the search_vector column (its columns and weights
+    # are defined by the trigger of migration 0021)
     filter_backends = [
-        DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = [
-        'species', 'supplied_breed',
-        'efabis_breed_country', 'sex']
-    search_fields = ['data_source_id', 'alternative_id', 'project',
-                     'submission_title', 'material', 'material_ontology',
-                     'person_last_name', 'person_email', 'person_affiliation',
-                     'person_role', 'person_role_ontology',
-                     'organization_name',
-                     'organization_role', 'organization_role_ontology',
-                     'gene_bank_name', 'gene_bank_country',
-                     'gene_bank_country_ontology', 'data_source_type',
-                     'data_source_version', 'species', 'species_ontology',
-                     'etag', 'submission_description', 'person_first_name',
-                     'organization_address', 'organization_country',
-                     'organization_country_ontology', 'description',
-                     'person_initial', 'organization_uri', 'publication_doi',
-                     'supplied_breed',
-                     'efabis_breed_country', 'sex',
-                     'sex_ontology',
-                     'birth_location_accuracy',
-                     'mapped_breed',
-                     'mapped_breed_ontology',
-                     'birth_date', 'birth_date_unit',
-                     'birth_location',
-                     'birth_location_longitude',
-                     'birth_location_longitude_unit',
-                     'birth_location_latitude',
-                     'birth_location_latitude_unit',
-                     'child_of']
+        DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
+    filterset_class = OrganismFilter
     ordering_fields = ['data_source_id']
 
     def get_queryset(self):
@@ -521,15 +738,14 @@ class ListOrganismsView(generics.ListCreateAPIView):
                         status=status.HTTP_400_BAD_REQUEST)
 
 
+@conditional_view('backend_organism')
 class ListOrganismsViewShort(generics.ListCreateAPIView):
     serializer_class = OrganismSerializerShort
     pagination_class = SmallResultsSetPagination
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
     filter_backends = [DjangoFilterBackend, filters.SearchFilter,
                        filters.OrderingFilter]
-    filterset_fields = [
-        'species', 'supplied_breed',
-        'efabis_breed_country', 'sex']
+    filterset_class = OrganismFilter
     search_fields = ['species', 'supplied_breed', 'sex']
     ordering_fields = ['data_source_id', 'species',
                        'supplied_breed', 'sex']
@@ -546,7 +762,10 @@ class ListOrganismsViewShort(generics.ListCreateAPIView):
                         status=status.HTTP_400_BAD_REQUEST)
 
 
-class OrganismsDetailsView(generics.RetrieveUpdateDestroyAPIView):
+@conditional_view(
+    'backend_organism', 'backend_dadislink', 'backend_species2commonname')
+class OrganismsDetailsView(
+        SparseFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
     # since we are searching with sampleinfo, I need to return only entries
     # with a relationship with Organism (organisms)
     queryset = Organism.objects.all()
@@ -555,6 +774,23 @@ class OrganismsDetailsView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
 
 
+class OrganismBulkView(BulkWriteMixin, generics.GenericAPIView):
+    queryset = Organism.objects.all()
+    serializer_class = OrganismSerializer
+
+
+class OrganismDownloadView(ExportMixin, generics.GenericAPIView):
+    queryset = Organism.objects.all()
+    permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
+    filter_backends = ListOrganismsView.filter_backends
+    filterset_class = ListOrganismsView.filterset_class
+    ordering_fields = ListOrganismsView.ordering_fields
+    export_columns = ('data_source_id', 'species', 'supplied_breed', 'sex')
+    export_header = ('Data source ID', 'Species', 'Supplied breed', 'Sex')
+    export_filename = "IMAGE_organisms"
+
+
+@conditional_view('backend_files')
 class ListCreateFilesView(generics.ListCreateAPIView):
     serializer_class = FilesSerializer
     pagination_class = LargeResultsSetPagination
@@ -574,19 +810,56 @@ class ListCreateFilesView(generics.ListCreateAPIView):
                         status=status.HTTP_400_BAD_REQUEST)
 
 
-def download_file_data(request):
-    data_to_download = 'Data source ID\tFile name\tFile size\tFile index\t' \
-                       'File index size\n'
-    results = Files.objects.all()
-    for record in results:
-        data_to_download += f'{record.data_source_id}\t{record.file_name}\t' \
-                            f'{record.file_size}\t{record.file_index_name}\t' \
-                            f'{record.file_index_size}\n'
-    response = HttpResponse(data_to_download, content_type='text/plain')
-    response['Content-Disposition'] = 'attachment; filename="IMAGE_files.txt'
-    return response
+class FilesDownloadView(ExportMixin, generics.GenericAPIView):
+    """Export files metadata (one row for each file). Files could be
+    filtered by 'species' or by specimen ids ('data_source_id', comma
+    separated). Use 'file_format=manifest' to get url and md5 checksum
+    for each file"""
 
+    queryset = Files.objects.all()
+    permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ListCreateFilesView.ordering_fields
+    export_formats = FILES_EXPORT_FORMATS
+    export_columns = (
+        'data_source_id', 'file_name', 'file_url', 'file_size',
+        'file_checksum', 'file_checksum_method')
+    export_header = (
+        'Data source ID', 'File name', 'File URL', 'File size',
+        'File checksum', 'File checksum method')
+    export_filename = "IMAGE_files"
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+
+        species = self.request.query_params.get('species', None)
+        specimens = self.request.query_params.get('data_source_id', None)
+
+        if species:
+            qs = qs.filter(
+                data_source_id__in=Specimen.objects.filter(
+                    species=species).values('data_source_id'))
+
+        if specimens:
+            qs = qs.filter(data_source_id__in=[
+                specimen.strip() for specimen in specimens.split(",")])
+
+        return qs
 
+    def get_export_data(self, queryset, file_format):
+        columns, header, rows = super().get_export_data(
+            queryset, file_format)
+
+        # one row for each file
+        rows = unnest_files(rows)
+
+        if file_format == 'manifest':
+            return ('file_url', 'file_checksum'), None, iter_manifest(rows)
+
+        return columns, header, rows
+
+
+@conditional_view('backend_files')
 class FilesDetailsView(generics.RetrieveAPIView):
     queryset = Files.objects.all()
     serializer_class = FilesSerializer
@@ -625,6 +898,7 @@ class FilesDetailsView(generics.RetrieveAPIView):
             )
 
 
+@conditional_view('backend_species2commonname')
 class SpeciesToCommonNameViewSet(viewsets.ReadOnlyModelViewSet):
     """
     This viewset automatically provides `list` and `detail` actions.
@@ -633,6 +907,7 @@ class SpeciesToCommonNameViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = Species2CommonNameSerializer
 
 
+@conditional_view('backend_dadislink', 'backend_species2commonname')
 class DADISLinkViewSet(viewsets.ModelViewSet):
     """
     Update DADIS table
@@ -642,6 +917,7 @@ class DADISLinkViewSet(viewsets.ModelViewSet):
     serializer_class = DADISLinkSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = LargeResultsSetPagination
+    cursor_ordering = '-id'
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = [
         'species__common_name', 'species__scientific_name', 'supplied_breed',
@@ -653,9 +929,9 @@ class DADISLinkViewSet(viewsets.ModelViewSet):
         'other_name']
 
 
-class EtagViewSet(viewsets.ModelViewSet):
+class EtagViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
     """
-    Get Info on Etags
+    Get Info on Etags (the registry is maintained by database triggers)
     """
 
     lookup_field = "data_source_id"
@@ -664,5 +940,42 @@ class EtagViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = LargeResultsSetPagination
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['data_source_id', 'etag']
+    filterset_fields = ['data_source_id', 'material', 'etag']
     ordering_fields = ['data_source_id']
+
+
+class EtagSnapshotView(ExportMixin, generics.GenericAPIView):
+    """
+    Stream all (accession, etag) pairs in a single response, as a compact
+    two-column text file (default) or as ndjson
+    """
+
+    # no ordering: rows are read with a sequential scan
+    queryset = Etag.objects.order_by()
+    permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['material']
+    export_columns = ('data_source_id', 'etag')
+    export_header = None
+    export_filename = "IMAGE_etags"
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def etag_diff(request, format=None):
+    """
+    Compare a list of [accession, etag] pairs with CDP etags. Return the
+    accessions which are new, changed or missing from the submitted list
+    """
+
+    accessions, etags, after, until = get_etag_diff_options(request.data)
+
+    return Response(diff_etags(accessions, etags, after, until))
+
+
+@api_view(['GET'])
+def cache_stats(request, format=None):
+    """Return the hits and misses of the shared response cache, counted by
+    the worker which serves this request"""
+
+    return Response(get_cache_stats())
@@ -16,8 +16,8 @@ from enum import Enum
 from helpers.biosamples import (
     get_biosamples_ids, CONNECTOR as EBI_CONNECTOR, get_biosample_record)
 from helpers.backend import (
-    post_record, put_record, CDPConverter, get_ruleset, Material,
-    CONNECTOR as CDP_CONNECTOR, get_all_cdp_etags)
+    post_records, CDPConverter, get_ruleset, Material, BULK_SIZE,
+    CONNECTOR as CDP_CONNECTOR, get_all_cdp_etags, get_cdp_etag_diff)
 
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -33,10 +33,11 @@ class Operation(Enum):
 
 
 async def process_record(
-        accession, ebi_session, cdp_session, converter, cdp_etags):
+        accession, ebi_session, converter, cdp_etags, pending):
     """
     Process a single BioSamples accession (BioSample ID): check etags
-    in both BioSamples and CDP and if necessary CREATE/UPDATE record
+    in both BioSamples and CDP and if necessary add the converted record to
+    the pending records (which are written with bulk requests)
 
     Parameters
     ----------
@@ -44,12 +45,12 @@ async def process_record(
         The BioSamples ID.
     ebi_session : aiohttp.ClientSession
         a client session specific for EBI (with limits defined).
-    cdp_session : aiohttp.ClientSession
-        a client session specific for CDP.
     converter : CDPConverter
         a CDPConverter instance for data conversion.
     cdp_etags : dict
         a dictionary for all the etags for CDP BioSamples IDs
+    pending : dict
+        the records to be written in CDP for each material
 
     Returns
     -------
@@ -91,27 +92,20 @@ async def process_record(
         logger.debug(f"Creating {accession}")
         operation = Operation.created
 
-        await post_record(
-            cdp_session,
-            # convert BioSamples data into CDP format
-            converter.convert_record(record, ebi_etag),
-            material.name)
-
     elif cdp_etag != ebi_etag:
         # make update to CDP
         logger.debug(f"Tags differ: Update {accession}")
         operation = Operation.updated
 
-        await put_record(
-            cdp_session,
-            accession,
-            # convert BioSamples data into CDP format
-            converter.convert_record(record, ebi_etag),
-            material.name)
-
     else:
         logger.debug(f"Etags are equal. Ignoring {accession}")
 
+    if operation != Operation.ignored:
+        # convert BioSamples data into CDP format. Bulk requests create
+        # new records and update the existing ones
+        pending[material.name].append(
+            converter.convert_record(record, ebi_etag))
+
     return operation, accession, ebi_etag
 
 
@@ -126,8 +120,12 @@ async def check_task_complete(task):
 
     Returns
     -------
-    None.
-
+    operation : Operation
+        The operation done on this accession.
+    accession : str
+        The processed The BioSamples ID.
+    etag : str
+        the BioSamples etag header attribute.
     """
     operation, accession, etag = await task
 
@@ -147,6 +145,48 @@ async def check_task_complete(task):
             f"({etag['error']}): is this a private sample?"
         )
 
+    return operation, accession, etag
+
+
+async def write_pending(cdp_session, pending, force=False):
+    """
+    Write pending records in CDP with bulk requests of BULK_SIZE records.
+    Remaining records are written only if force is True
+
+    Parameters
+    ----------
+    cdp_session : aiohttp.ClientSession
+        a client session specific for CDP.
+    pending : dict
+        the records to be written in CDP for each material.
+    force : bool, optional
+        Write all pending records. The default is False.
+
+    Returns
+    -------
+    None.
+    """
+
+    for record_type, records in pending.items():
+        while len(records) >= BULK_SIZE or (force and records):
+            batch = records[:BULK_SIZE]
+            del records[:BULK_SIZE]
+
+            await post_records(cdp_session, batch, record_type)
+
+
+def track_etag(ebi_etags, failed, result):
+    """Track the BioSamples etag of a processed accession (or the accession
+    itself, if it couldn't be read from BioSamples)"""
+
+    operation, accession, etag = result
+
+    if operation != Operation.error:
+        ebi_etags[accession] = etag
+
+    else:
+        failed.add(accession)
+
 
 async def main():
     """
@@ -189,6 +229,15 @@ async def main():
             tasks = []
             counter = 0
 
+            # track BioSamples etags (to check CDP status at the end)
+            ebi_etags = dict()
+
+            # accessions which couldn't be read from BioSamples
+            failed = set()
+
+            # records to be created or updated for each material
+            pending = {material.name: list() for material in Material}
+
             # TODO: operate on a bacth of BioSamples id
             # go through biosample ids. async generator is not an iterable!
             async for accession in get_biosamples_ids(ebi_session):
@@ -197,9 +246,9 @@ async def main():
                     process_record(
                         accession,
                         ebi_session,
-                        cdp_session,
                         converter,
-                        cdp_etags)
+                        cdp_etags,
+                        pending)
                 )
 
                 # append task
@@ -216,17 +265,42 @@ async def main():
                     )
 
                     for task in asyncio.as_completed(tasks):
-                        await check_task_complete(task)
+                        track_etag(
+                            ebi_etags, failed, await check_task_complete(task))
 
                     # reset task list
                     tasks = []
 
+                    # write full batches of records
+                    await write_pending(cdp_session, pending)
+
             # await for tasks completion (for remaining task)
             if len(tasks) > 0:
                 logger.debug("Completing the remaining tasks")
 
                 for task in asyncio.as_completed(tasks):
-                    await check_task_complete(task)
+                    track_etag(
+                        ebi_etags, failed, await check_task_complete(task))
+
+            # write the remaining records
+            await write_pending(cdp_session, pending, force=True)
+
+        # compare BioSamples etags with CDP in a few batched requests
+        logger.info("Checking CDP etags")
+        diff = await get_cdp_etag_diff(cdp_session, ebi_etags)
+
+        for accession in diff['new'] + diff['changed']:
+            logger.error(f"Sample {accession} is not up to date in CDP")
+
+        for accession in diff['missing']:
+            # failed accessions are still listed by BioSamples
+            if accession in failed:
+                logger.warning(
+                    f"Sample {accession} couldn't be read from BioSamples")
+
+            else:
+                logger.warning(
+                    f"Sample {accession} is not in BioSamples anymore")
 
 
 if __name__ == "__main__":
@@ -6,24 +6,31 @@ Created on Sat Jun  6 16:41:54 2020
 @author: Paolo Cozzi <paolo.cozzi@ibba.cnr.it>
 """
 
+import csv
+import zlib
+import codecs
 import logging
 import aiohttp
-import asyncio
 
+from yarl import URL
 from multidict import MultiDict
 from enum import Enum
 from decouple import config
 
-from .common import parse_json, HEADERS, fetch_page
+from .common import parse_json, HEADERS
 
-# Setting page size for CDP requests
-PAGE_SIZE = 500
-
-# define custom parameters
-PARAMS = MultiDict([
-    ('page_size', PAGE_SIZE),
+# get etags as a compressed two-column text file
+SNAPSHOT_PARAMS = MultiDict([
+    ('file_format', 'tsv'),
+    ('compression', 'gzip'),
 ])
 
+# the number of etags sent with each etag diff request
+DIFF_BATCH_SIZE = 10000
+
+# the number of records created or updated with each bulk request
+BULK_SIZE = 500
+
 # limiting the number of connections
 # https://docs.aiohttp.org/en/stable/client_advanced.html
 CONNECTOR = aiohttp.TCPConnector(limit=20, ttl_dns_cache=300)
@@ -84,16 +91,17 @@ async def get_cdp_etag(session, accession):
         raise NotImplementedError("Status code not managed")
 
 
-async def get_all_cdp_etags(session, params=PARAMS):
+async def get_all_cdp_etags(session, params=SNAPSHOT_PARAMS):
     """
-    Get all CPD etags as a dict
+    Get all CPD etags as a dict. Read the etag snapshot (a gzipped
+    two-column text file) in a single request
 
     Parameters
     ----------
     session : aiohttp.ClientSession
         an async session object.
     params : MultiDict, optional
-        Specify query parameters. The default is PARAMS.
+        Specify query parameters. The default is SNAPSHOT_PARAMS.
 
     Raises
     ------
@@ -106,65 +114,114 @@ async def get_all_cdp_etags(session, params=PARAMS):
         A dictionary of etags for each BioSamples accessions.
     """
 
-    url = f"{BACKEND_URL}/etag/"
+    url = URL(f"{BACKEND_URL}/etag/snapshot/").update_query(params)
     logger.debug(f"GET {url}")
 
-    # get data for the first time to determine how many pages I have
-    # to request
-    data, url = await fetch_page(session, url, params)
+    # define the results array
+    results = dict()
+
+    # decompress gzip data while reading. A multibyte character could be
+    # split between chunks, so text is decoded incrementally
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    remainder = ""
 
-    logger.debug(f"Got data from {url}")
+    def parse_lines(lines):
+        # etags are quoted, so read them with a csv reader
+        for accession, etag in csv.reader(lines, delimiter="\t"):
+            results[accession] = etag
 
-    # maybe the request had issues
-    if data == {}:
-        logger.warning("Got a result with no data")
-        raise ConnectionError("Can't fetch CDP for accession")
+    try:
+        async with session.get(url) as response:
+            if response.status != 200:
+                message = await response.text()
+                logger.error(message[-200:])
+                raise ConnectionError("Can't fetch CDP etags")
 
-    logger.info("Got %s etags from CDP" % (data['count']))
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                data = remainder + decoder.decode(
+                    decompressor.decompress(chunk))
 
-    # define the results array
-    results = dict()
+                # the last line could be incomplete
+                *lines, remainder = data.split("\n")
+                parse_lines(lines)
+
+    except aiohttp.client_exceptions.ClientPayloadError as exc:
+        logger.error(repr(exc))
+        raise ConnectionError("Can't fetch CDP etags")
+
+    data = remainder + decoder.decode(decompressor.flush(), final=True)
+    parse_lines(line for line in data.split("\n") if line)
+
+    logger.info("Got %s etags from CDP" % (len(results)))
+
+    return results
+
+
+async def get_cdp_etag_diff(session, etags, batch_size=DIFF_BATCH_SIZE):
+    """
+    Compare etags with CDP etags in batches. Each batch covers a range of
+    sorted accessions, so CDP accessions not submitted are reported once
+
+    Parameters
+    ----------
+    session : aiohttp.ClientSession
+        an async session object.
+    etags : dict
+        A dictionary of etags for each BioSamples accessions.
+    batch_size : int, optional
+        The number of etags sent with each request. The default is
+        DIFF_BATCH_SIZE.
+
+    Raises
+    ------
+    ConnectionError
+        raised if there are connection issues.
+
+    Returns
+    -------
+    results : dict
+        A dictionary with the 'new', 'changed' and 'missing' accessions.
+    """
 
-    # ok collect the next tasks
-    tasks = []
+    global AUTH
+
+    url = f"{BACKEND_URL}/etag/diff/"
+    results = {'new': [], 'changed': [], 'missing': []}
 
-    # get total page
-    totalPages = data['total_pages']
+    accessions = sorted(etags)
 
-    # generate new awaitable objects. The last page is COMPRISED
-    # page 1 is the same of not saying pages in query params.
-    for page in range(1, totalPages+1):
-        # get a new param object to edit
-        my_params = params.copy()
+    # the first batch has no lower bound, the last has no upper bound
+    after = None
 
-        # edit a multidict object
-        my_params.update(page=page)
+    for start in range(0, max(len(accessions), 1), batch_size):
+        batch = accessions[start:start+batch_size]
+        until = batch[-1] if start + batch_size < len(accessions) else None
 
-        # track the new awaitable object
-        tasks.append(fetch_page(session, url, my_params))
+        logger.debug(f"POST {url} ({after}, {until}]")
 
-        # There is no benefit to launching a million requests at once.
-        # limit and wait for those before continuing the loop.
-        # https://stackoverflow.com/a/54620443
-        # TODO: process a batch of tasks or increase page size as a
-        # workaround)
+        data = {
+            'etags': [[accession, etags[accession]] for accession in batch],
+            'after': after,
+            'until': until}
 
-    # Run awaitable objects in the aws set concurrently.
-    # Return an iterator of Future objects.
-    for task in asyncio.as_completed(tasks):
-        # read data
-        data, url = await task
+        response = await session.post(
+            url,
+            json=data,
+            headers=HEADERS,
+            auth=AUTH)
 
-        logger.debug(f"Got data from {url}")
+        if response.status != 200:
+            message = await response.text()
+            logger.error(message[-200:])
+            raise ConnectionError("Can't compare etags with CDP")
 
-        # maybe the request had issues
-        if data == {}:
-            logger.warning(f"Got a result with no data for {url}")
-            continue
+        data = await parse_json(response, url)
 
-        # iterate over result once
-        for result in data['results']:
-            results[result["data_source_id"]] = result["etag"]
+        for key in results:
+            results[key] += data[key]
+
+        after = until
 
     return results
 
@@ -241,6 +298,57 @@ async def put_record(session, biosample_id, record, record_type):
         logger.error(message[-200:])
 
 
+async def post_records(session, records, record_type):
+    """
+    Create or update many 'record_type' records in CDP with a single bulk
+    request (existing records are updated)
+
+    Parameters
+    ----------
+    session : aiohttp.ClientSession
+        a client session object.
+    records : list
+        The CDP records to write.
+    record_type : str
+        Could be 'organism' or 'specimen'.
+
+    Returns
+    -------
+    results : list
+        The status of each record (an empty list if the request failed).
+    """
+
+    global AUTH
+
+    url = f'{BACKEND_URL}/{record_type}/bulk/'
+    logger.debug(f"POST {len(records)} records {url}")
+
+    response = await session.post(
+        url,
+        json=records,
+        headers=HEADERS,
+        auth=AUTH)
+
+    if response.status != 200:
+        message = await response.text()
+        logger.error(message[-200:])
+        return []
+
+    data = await parse_json(response, url)
+
+    for result in data['results']:
+        if result['status'] == 'error':
+            logger.error(
+                f"Cannot write {result['data_source_id']}: "
+                f"{result['errors']}")
+
+    logger.info(
+        f"{record_type}: {data['created']} created, {data['updated']} "
+        f"updated, {data['error']} errors")
+
+    return data['results']
+
+
 def get_text_unit_field(sample, biosample_name, field_to_fetch, is_list=False):
     """
     This function will parse text and unit fields in biosamples
@@ -259,8 +259,8 @@ def process_custom_records():
         params = {
             'species': dadis['species']['scientific_name'],
             'efabis_breed_country': dadis['country'],
-            # case insensitive search for supplied breed
-            'search': dadis['supplied_breed'],
+            # case insensitive match for supplied breed
+            'supplied_breed__iexact': dadis['supplied_breed'],
         }
 
         # test and update my organism if necessary, relying on custom record
@@ -317,8 +317,8 @@ def process_fao_records():
         if dadis['most_common_name'].lower() in summary_breeds:
             check_key = 'most_common_name'
 
-            # case insensitive search for supplied breed
-            params['search'] = dadis[check_key]
+            # case insensitive match for supplied breed
+            params['supplied_breed__iexact'] = dadis[check_key]
 
             logger.debug(
                 f"{dadis}: Found a match in {check_key}: {dadis[check_key]}")
@@ -326,8 +326,8 @@ def process_fao_records():
         elif dadis['transboundary_name'].lower() in summary_breeds:
             check_key = 'transboundary_name'
 
-            # case insensitive search for supplied breed
-            params['search'] = dadis[check_key]
+            # case insensitive match for supplied breed
+            params['supplied_breed__iexact'] = dadis[check_key]
 
             logger.debug(
                 f"{dadis}: Found a match in {check_key}: {dadis[check_key]}")
@@ -337,8 +337,8 @@ def process_fao_records():
                 if name.lower() in summary_breeds:
                     check_key = 'other_name'
 
-                    # case insensitive search for supplied breed
-                    params['search'] = name
+                    # case insensitive match for supplied breed
+                    params['supplied_breed__iexact'] = name
 
                     logger.debug(
                         f"{dadis}: Found a match in {check_key}: "
@@ -352,8 +352,8 @@ def process_fao_records():
             # a cicle in other name
 
         # Here I should have found a match somewhere or not. If I do, I have
-        # a search attribute to get a list of organism to update
-        if 'search' in params:
+        # a breed attribute to get a list of organism to update
+        if 'supplied_breed__iexact' in params:
             # test and update my organism if necessary
             update_organism(params, dadis, check_key)
 
@@ -372,8 +372,9 @@ def update_organism(params, dadis, check_key='most_common_name'):
     params : dict
         A dictionary passed to the organism endpoint to filter out organism
         record, relying on endpoint parameters like'species' and
-        'efabis_breed_country'. Breed name is searched with 'search' key in
-        order to provide a case insensitive search.
+        'efabis_breed_country'. Breed name is matched with
+        'supplied_breed__iexact' key in order to do a case insensitive
+        lookup.
     dadis : dict
         A dictionary required to update the dadis_link endpoint, as
         returned by :py:meth:`parse_fao_record`. This function will manage
@@ -414,8 +415,8 @@ def update_organism(params, dadis, check_key='most_common_name'):
 
     # now update organisms dadis record
     for organism in organisms:
-        # since I'm searching for breed name (not exact) I need to filter
-        # out partial matches
+        # breed names are matched case insensitive by CDP: however check
+        # names again before patching
 
         # check other_name first, since its a special case
         if check_key == 'other_name':
@@ -484,7 +485,8 @@ def update_organism(params, dadis, check_key='most_common_name'):
     # block for a single record
     if counter > 0:
         logger.info(
-            f"Updated {counter} record for '{params['search']}': {dadis}")
+            f"Updated {counter} record for "
+            f"'{params['supplied_breed__iexact']}': {dadis}")
 
 
 if __name__ == "__main__":